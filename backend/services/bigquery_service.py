@@ -116,6 +116,7 @@ class BigQueryService:
             bigquery.SchemaField("road_type", "STRING"),
             bigquery.SchemaField("weather", "STRING"),
             bigquery.SchemaField("source", "STRING"),
+            bigquery.SchemaField("city", "STRING"),
         ]
         
         schemas = {
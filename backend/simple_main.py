@@ -4,14 +4,18 @@
 DriveWise AI - Simple FastAPI Backend for Hackathon Demo
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
+import asyncio
+import functools
 import random
 import json
 import os
+import time
 from nhtsa_connector import NHTSAConnector
 
 # Check if we should use mock Vertex AI
@@ -45,6 +49,27 @@ app = FastAPI(
 # Initialize NHTSA connector
 nhtsa = NHTSAConnector()
 
+class _NHTSALookupFailed(Exception):
+    """Carries an error fallback out of the cached lookup so it is not memoized"""
+    def __init__(self, fallback: Dict[str, Any]):
+        super().__init__(fallback.get("error"))
+        self.fallback = fallback
+
+@functools.lru_cache(maxsize=1024)
+def _cached_nhtsa_lookup(year: int, make: str, model: str) -> Dict[str, Any]:
+    """NHTSA ratings are effectively immutable per (year, make, model)"""
+    result = nhtsa.get_vehicle_safety_rating(year, make, model)
+    if result.get("api_status") == "error":
+        raise _NHTSALookupFailed(result)
+    return result
+
+def _nhtsa_lookup(year: int, make: str, model: str) -> Dict[str, Any]:
+    """Blocking NHTSA lookup, memoized on success; run it off the event loop"""
+    try:
+        return _cached_nhtsa_lookup(year, make, model)
+    except _NHTSALookupFailed as e:
+        return e.fallback
+
 # Initialize Vertex AI service (if available)
 if VERTEX_AI_AVAILABLE:
     try:
@@ -64,6 +89,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress the larger JSON payloads (portfolio, analytics, dashboard)
+app.add_middleware(GZipMiddleware, minimum_size=500)
+
+# Cached second-resolution UTC timestamp shared by all responses
+_last_sec = 0
+_last_iso = ""
+
+def fast_iso() -> str:
+    """Return the current UTC time as ISO 8601, formatting at most once per second"""
+    global _last_sec, _last_iso
+    sec = int(time.time())
+    if sec != _last_sec:
+        # Single event loop per worker, so no lock is needed
+        _last_iso = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(sec))
+        _last_sec = sec
+    return _last_iso
+
 # Pydantic models
 class DrivingQuery(BaseModel):
     user_id: str
@@ -134,51 +176,169 @@ MOCK_USERS = {
     }
 }
 
+# Define risk ranges based on driver profile
+_RISK_PROFILES = {
+    "safe_driver": {
+        "overall": (0.10, 0.20),
+        "speeding": (0.05, 0.15),
+        "braking": (0.08, 0.18),
+        "acceleration": (0.06, 0.16),
+        "distraction": (0.02, 0.12)
+    },
+    "average_driver": {
+        "overall": (0.20, 0.35),
+        "speeding": (0.15, 0.30),
+        "braking": (0.18, 0.35),
+        "acceleration": (0.12, 0.28),
+        "distraction": (0.08, 0.22)
+    },
+    "tech_savvy_driver": {
+        "overall": (0.12, 0.25),
+        "speeding": (0.08, 0.20),
+        "braking": (0.10, 0.22),
+        "acceleration": (0.08, 0.20),
+        "distraction": (0.03, 0.15)
+    },
+    "experienced_driver": {
+        "overall": (0.15, 0.28),
+        "speeding": (0.10, 0.22),
+        "braking": (0.12, 0.25),
+        "acceleration": (0.10, 0.24),
+        "distraction": (0.05, 0.18)
+    },
+    "family_driver": {
+        "overall": (0.18, 0.30),
+        "speeding": (0.12, 0.25),
+        "braking": (0.15, 0.28),
+        "acceleration": (0.10, 0.22),
+        "distraction": (0.06, 0.20)
+    }
+}
+
+# Define safety score ranges based on driver profile
+_SAFETY_PROFILES = {
+    "safe_driver": {
+        "overall": (85, 95),
+        "following_distance": (0.85, 0.95),
+        "smooth_acceleration": (0.88, 0.98),
+        "smooth_braking": (0.86, 0.96),
+        "speed_adherence": (0.80, 0.92),
+        "defensive_driving": (0.85, 0.95),
+        "attention": (0.90, 0.98),
+        "ranking": (80, 95),
+        "suggestions": (
+            "Excellent driving! Consider sharing tips with other drivers",
+            "Your safety habits are exemplary",
+            "Keep up the outstanding defensive driving"
+        )
+    },
+    "average_driver": {
+        "overall": (70, 85),
+        "following_distance": (0.70, 0.85),
+        "smooth_acceleration": (0.75, 0.90),
+        "smooth_braking": (0.72, 0.87),
+        "speed_adherence": (0.65, 0.80),
+        "defensive_driving": (0.70, 0.85),
+        "attention": (0.75, 0.90),
+        "ranking": (50, 75),
+        "suggestions": (
+            "Maintain greater following distance on highways",
+            "Reduce speed variations during city driving", 
+            "Practice smoother braking in traffic"
+        )
+    },
+    "tech_savvy_driver": {
+        "overall": (78, 92),
+        "following_distance": (0.80, 0.92),
+        "smooth_acceleration": (0.82, 0.94),
+        "smooth_braking": (0.80, 0.93),
+        "speed_adherence": (0.75, 0.88),
+        "defensive_driving": (0.78, 0.90),
+        "attention": (0.85, 0.96),
+        "ranking": (65, 88),
+        "suggestions": (
+            "Use your vehicle's safety features more consistently",
+            "Your tech awareness translates to safer driving",
+            "Consider eco-driving modes for smoother acceleration"
+        )
+    },
+    "experienced_driver": {
+        "overall": (75, 88),
+        "following_distance": (0.78, 0.90),
+        "smooth_acceleration": (0.80, 0.92),
+        "smooth_braking": (0.82, 0.94),
+        "speed_adherence": (0.72, 0.86),
+        "defensive_driving": (0.85, 0.95),
+        "attention": (0.80, 0.92),
+        "ranking": (60, 82),
+        "suggestions": (
+            "Your experience shows in defensive driving",
+            "Consider adapting to modern traffic patterns",
+            "Excellent hazard recognition skills"
+        )
+    },
+    "family_driver": {
+        "overall": (72, 86),
+        "following_distance": (0.75, 0.88),
+        "smooth_acceleration": (0.78, 0.90),
+        "smooth_braking": (0.76, 0.89),
+        "speed_adherence": (0.70, 0.84),
+        "defensive_driving": (0.80, 0.92),
+        "attention": (0.78, 0.90),
+        "ranking": (55, 78),
+        "suggestions": (
+            "Great job prioritizing passenger safety",
+            "Your cautious approach benefits your family",
+            "Consider practicing emergency maneuvers"
+        )
+    }
+}
+
+# Define trip patterns based on driver profile and location
+_TRIP_PATTERNS = {
+    "safe_driver": {
+        "events_likelihood": 0.1,
+        "speed_range": (40, 70),
+        "distance_range": (15, 35),
+        "common_events": ("smooth_drive",),
+        "routes": ("Home to Work", "Work to Grocery", "Weekend Errands")
+    },
+    "average_driver": {
+        "events_likelihood": 0.3,
+        "speed_range": (45, 85),
+        "distance_range": (18, 45),
+        "common_events": ("hard_brake", "speeding", "rapid_acceleration"),
+        "routes": ("Daily Commute", "Shopping Trip", "Social Visit")
+    },
+    "tech_savvy_driver": {
+        "events_likelihood": 0.15,
+        "speed_range": (42, 75),
+        "distance_range": (20, 40),
+        "common_events": ("eco_driving", "adaptive_cruise"),
+        "routes": ("Tech Campus Commute", "Coffee Run", "Gym Visit")
+    },
+    "experienced_driver": {
+        "events_likelihood": 0.2,
+        "speed_range": (38, 78),
+        "distance_range": (25, 50),
+        "common_events": ("defensive_driving", "weather_adjusted"),
+        "routes": ("Long Commute", "Business Meeting", "Family Visit")
+    },
+    "family_driver": {
+        "events_likelihood": 0.25,
+        "speed_range": (35, 70),  
+        "distance_range": (12, 30),
+        "common_events": ("school_zone_slow", "careful_parking"),
+        "routes": ("School Drop-off", "Soccer Practice", "Family Outing")
+    }
+}
+
 def get_mock_risk_score(user_id: str) -> Dict[str, Any]:
     """Generate mock risk score data based on user profile"""
     # Get user profile to determine risk characteristics
     user_profile = MOCK_USERS.get(user_id, {}).get("profile_type", "average_driver")
     
-    # Define risk ranges based on driver profile
-    risk_profiles = {
-        "safe_driver": {
-            "overall": (0.10, 0.20),
-            "speeding": (0.05, 0.15),
-            "braking": (0.08, 0.18),
-            "acceleration": (0.06, 0.16),
-            "distraction": (0.02, 0.12)
-        },
-        "average_driver": {
-            "overall": (0.20, 0.35),
-            "speeding": (0.15, 0.30),
-            "braking": (0.18, 0.35),
-            "acceleration": (0.12, 0.28),
-            "distraction": (0.08, 0.22)
-        },
-        "tech_savvy_driver": {
-            "overall": (0.12, 0.25),
-            "speeding": (0.08, 0.20),
-            "braking": (0.10, 0.22),
-            "acceleration": (0.08, 0.20),
-            "distraction": (0.03, 0.15)
-        },
-        "experienced_driver": {
-            "overall": (0.15, 0.28),
-            "speeding": (0.10, 0.22),
-            "braking": (0.12, 0.25),
-            "acceleration": (0.10, 0.24),
-            "distraction": (0.05, 0.18)
-        },
-        "family_driver": {
-            "overall": (0.18, 0.30),
-            "speeding": (0.12, 0.25),
-            "braking": (0.15, 0.28),
-            "acceleration": (0.10, 0.22),
-            "distraction": (0.06, 0.20)
-        }
-    }
-    
-    profile = risk_profiles.get(user_profile, risk_profiles["average_driver"])
+    profile = _RISK_PROFILES.get(user_profile, _RISK_PROFILES["average_driver"])
     
     return {
         "user_id": user_id,
@@ -193,7 +353,7 @@ def get_mock_risk_score(user_id: str) -> Dict[str, Any]:
             "traffic_score": round(random.uniform(0.25, 0.45), 3)
         },
         "confidence": round(random.uniform(0.82, 0.94), 2),
-        "timestamp": datetime.now().isoformat()
+        "timestamp": fast_iso()
     }
 
 def get_mock_safety_score(user_id: str) -> Dict[str, Any]:
@@ -201,86 +361,7 @@ def get_mock_safety_score(user_id: str) -> Dict[str, Any]:
     user_profile = MOCK_USERS.get(user_id, {}).get("profile_type", "average_driver")
     user_name = MOCK_USERS.get(user_id, {}).get("name", "User")
     
-    # Define safety score ranges based on driver profile
-    safety_profiles = {
-        "safe_driver": {
-            "overall": (85, 95),
-            "following_distance": (0.85, 0.95),
-            "smooth_acceleration": (0.88, 0.98),
-            "smooth_braking": (0.86, 0.96),
-            "speed_adherence": (0.80, 0.92),
-            "defensive_driving": (0.85, 0.95),
-            "attention": (0.90, 0.98),
-            "ranking": (80, 95),
-            "suggestions": [
-                "Excellent driving! Consider sharing tips with other drivers",
-                "Your safety habits are exemplary",
-                "Keep up the outstanding defensive driving"
-            ]
-        },
-        "average_driver": {
-            "overall": (70, 85),
-            "following_distance": (0.70, 0.85),
-            "smooth_acceleration": (0.75, 0.90),
-            "smooth_braking": (0.72, 0.87),
-            "speed_adherence": (0.65, 0.80),
-            "defensive_driving": (0.70, 0.85),
-            "attention": (0.75, 0.90),
-            "ranking": (50, 75),
-            "suggestions": [
-                "Maintain greater following distance on highways",
-                "Reduce speed variations during city driving", 
-                "Practice smoother braking in traffic"
-            ]
-        },
-        "tech_savvy_driver": {
-            "overall": (78, 92),
-            "following_distance": (0.80, 0.92),
-            "smooth_acceleration": (0.82, 0.94),
-            "smooth_braking": (0.80, 0.93),
-            "speed_adherence": (0.75, 0.88),
-            "defensive_driving": (0.78, 0.90),
-            "attention": (0.85, 0.96),
-            "ranking": (65, 88),
-            "suggestions": [
-                "Use your vehicle's safety features more consistently",
-                "Your tech awareness translates to safer driving",
-                "Consider eco-driving modes for smoother acceleration"
-            ]
-        },
-        "experienced_driver": {
-            "overall": (75, 88),
-            "following_distance": (0.78, 0.90),
-            "smooth_acceleration": (0.80, 0.92),
-            "smooth_braking": (0.82, 0.94),
-            "speed_adherence": (0.72, 0.86),
-            "defensive_driving": (0.85, 0.95),
-            "attention": (0.80, 0.92),
-            "ranking": (60, 82),
-            "suggestions": [
-                "Your experience shows in defensive driving",
-                "Consider adapting to modern traffic patterns",
-                "Excellent hazard recognition skills"
-            ]
-        },
-        "family_driver": {
-            "overall": (72, 86),
-            "following_distance": (0.75, 0.88),
-            "smooth_acceleration": (0.78, 0.90),
-            "smooth_braking": (0.76, 0.89),
-            "speed_adherence": (0.70, 0.84),
-            "defensive_driving": (0.80, 0.92),
-            "attention": (0.78, 0.90),
-            "ranking": (55, 78),
-            "suggestions": [
-                "Great job prioritizing passenger safety",
-                "Your cautious approach benefits your family",
-                "Consider practicing emergency maneuvers"
-            ]
-        }
-    }
-    
-    profile = safety_profiles.get(user_profile, safety_profiles["average_driver"])
+    profile = _SAFETY_PROFILES.get(user_profile, _SAFETY_PROFILES["average_driver"])
     
     return {
         "user_id": user_id,
@@ -293,9 +374,9 @@ def get_mock_safety_score(user_id: str) -> Dict[str, Any]:
             "defensive_driving": round(random.uniform(*profile["defensive_driving"]), 3),
             "attention_level": round(random.uniform(*profile["attention"]), 3)
         },
-        "improvement_suggestions": profile["suggestions"],
+        "improvement_suggestions": list(profile["suggestions"]),
         "comparative_ranking": random.randint(*profile["ranking"]),
-        "timestamp": datetime.now().isoformat()
+        "timestamp": fast_iso()
     }
 
 def get_mock_dashboard_data(user_id: str) -> Dict[str, Any]:
@@ -303,46 +384,7 @@ def get_mock_dashboard_data(user_id: str) -> Dict[str, Any]:
     user_profile = MOCK_USERS.get(user_id, {}).get("profile_type", "average_driver")
     user_location = MOCK_USERS.get(user_id, {}).get("location", "Unknown")
     
-    # Define trip patterns based on driver profile and location
-    trip_patterns = {
-        "safe_driver": {
-            "events_likelihood": 0.1,
-            "speed_range": (40, 70),
-            "distance_range": (15, 35),
-            "common_events": ["smooth_drive"],
-            "routes": ["Home to Work", "Work to Grocery", "Weekend Errands"]
-        },
-        "average_driver": {
-            "events_likelihood": 0.3,
-            "speed_range": (45, 85),
-            "distance_range": (18, 45),
-            "common_events": ["hard_brake", "speeding", "rapid_acceleration"],
-            "routes": ["Daily Commute", "Shopping Trip", "Social Visit"]
-        },
-        "tech_savvy_driver": {
-            "events_likelihood": 0.15,
-            "speed_range": (42, 75),
-            "distance_range": (20, 40),
-            "common_events": ["eco_driving", "adaptive_cruise"],
-            "routes": ["Tech Campus Commute", "Coffee Run", "Gym Visit"]
-        },
-        "experienced_driver": {
-            "events_likelihood": 0.2,
-            "speed_range": (38, 78),
-            "distance_range": (25, 50),
-            "common_events": ["defensive_driving", "weather_adjusted"],
-            "routes": ["Long Commute", "Business Meeting", "Family Visit"]
-        },
-        "family_driver": {
-            "events_likelihood": 0.25,
-            "speed_range": (35, 70),  
-            "distance_range": (12, 30),
-            "common_events": ["school_zone_slow", "careful_parking"],
-            "routes": ["School Drop-off", "Soccer Practice", "Family Outing"]
-        }
-    }
-    
-    pattern = trip_patterns.get(user_profile, trip_patterns["average_driver"])
+    pattern = _TRIP_PATTERNS.get(user_profile, _TRIP_PATTERNS["average_driver"])
     
     # Generate 3 recent trips
     recent_trips = []
@@ -497,28 +539,66 @@ def get_safety_score_data(user_id: str) -> Dict[str, Any]:
         "speed_limit_adherence": safety_data["safety_metrics"]["speed_limit_adherence"]
     }
 
+# Static responses, encoded once at import time
+_TIMESTAMP_MARK = "__timestamp__"
+
+def _encode_around_timestamp(payload: Dict[str, Any]) -> Tuple[bytes, bytes]:
+    """Pre-encode a JSON payload, split where its "timestamp" value goes"""
+    encoded = json.dumps(
+        {**payload, "timestamp": _TIMESTAMP_MARK},
+        ensure_ascii=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+    prefix, suffix = encoded.split(_TIMESTAMP_MARK.encode("utf-8"))
+    return prefix, suffix
+
+_ROOT_PREFIX, _ROOT_SUFFIX = _encode_around_timestamp({
+    "message": "DriveWise AI API is running!",
+    "status": "healthy",
+    "timestamp": None,
+    "version": "1.0.0"
+})
+
+_HEALTH_PREFIX, _HEALTH_SUFFIX = _encode_around_timestamp({
+    "status": "healthy",
+    "timestamp": None,
+    "services": {
+        "api": "running",
+        "mock_data": "available"
+    }
+})
+
+_USERS_BYTES = json.dumps(
+    {
+        "users": [
+            {
+                "user_id": user_id,
+                **user_data
+            }
+            for user_id, user_data in MOCK_USERS.items()
+        ],
+        "total_users": len(MOCK_USERS)
+    },
+    ensure_ascii=False,
+    separators=(",", ":")
+).encode("utf-8")
+
 # API Routes
 @app.get("/")
 async def root():
     """Health check endpoint"""
-    return {
-        "message": "DriveWise AI API is running!",
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0"
-    }
+    return Response(
+        _ROOT_PREFIX + fast_iso().encode("ascii") + _ROOT_SUFFIX,
+        media_type="application/json"
+    )
 
 @app.get("/health")
 async def health_check():
     """Detailed health check"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "services": {
-            "api": "running",
-            "mock_data": "available"
-        }
-    }
+    return Response(
+        _HEALTH_PREFIX + fast_iso().encode("ascii") + _HEALTH_SUFFIX,
+        media_type="application/json"
+    )
 
 @app.get("/api/v1/risk-score/{user_id}")
 async def get_risk_score(user_id: str):
@@ -542,7 +622,7 @@ async def chat_with_ai(query: DrivingQuery):
     
     return {
         "response": response_text,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": fast_iso(),
         "user_id": query.user_id,
         "ai_powered": VERTEX_AI_AVAILABLE and vertex_ai_service is not None
     }
@@ -579,22 +659,13 @@ async def get_traffic_hotspots(lat: float = 37.7749, lon: float = -122.4194, rad
         ],
         "center": {"lat": lat, "lon": lon},
         "radius": radius,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": fast_iso()
     }
 
 @app.get("/api/v1/users")
 async def list_all_users():
     """Get all demo users for presentation"""
-    return {
-        "users": [
-            {
-                "user_id": user_id,
-                **user_data
-            }
-            for user_id, user_data in MOCK_USERS.items()
-        ],
-        "total_users": len(MOCK_USERS)
-    }
+    return Response(_USERS_BYTES, media_type="application/json")
 
 @app.get("/api/v1/user/{user_id}")
 async def get_user_info(user_id: str):
@@ -604,57 +675,64 @@ async def get_user_info(user_id: str):
     
     return MOCK_USERS[user_id]
 
+async def _score_user(user_id: str, user_data: Dict[str, Any], ts: datetime) -> Dict[str, Any]:
+    """Score a single portfolio customer; blocking lookups belong in asyncio.to_thread"""
+    # Get scores for the user
+    risk_data = get_mock_risk_score(user_id)
+    safety_data = get_mock_safety_score(user_id)
+    
+    # Calculate premium based on risk
+    base_premium = 120
+    risk_score = risk_data["overall_score"]
+    discount_percent = round((1 - risk_score) * 25)
+    current_premium = round(base_premium * (1 - discount_percent / 100))
+    
+    # Determine risk tier
+    if risk_score < 0.2:
+        tier = "excellent"
+    elif risk_score < 0.25:
+        tier = "good" 
+    elif risk_score < 0.35:
+        tier = "average"
+    else:
+        tier = "high_risk"
+    
+    return {
+        "id": user_id,
+        "name": user_data["name"],
+        "vehicle": user_data["vehicle"],
+        "location": user_data["location"],
+        "risk_score": risk_score,
+        "safety_score": round(safety_data["overall_score"]),
+        "current_premium": current_premium,
+        "standard_premium": base_premium,
+        "discount_percent": discount_percent if discount_percent > 0 else 0,
+        "surcharge_percent": abs(discount_percent) if discount_percent < 0 else 0,
+        "risk_tier": tier,
+        "months_tracked": random.randint(6, 12),
+        "total_trips": random.randint(150, 500),
+        "claims": 1 if tier == "high_risk" and random.random() < 0.3 else 0,
+        "last_update": ts.date().isoformat()
+    }
+
 @app.get("/api/v1/insurance/portfolio")
 async def get_insurance_portfolio():
     """Get insurance company portfolio overview"""
+    ts = datetime.now()
+    
+    # Score all customers concurrently
+    customer_details = await asyncio.gather(
+        *[_score_user(user_id, user_data, ts) for user_id, user_data in MOCK_USERS.items()]
+    )
+    
     # Calculate portfolio metrics from all users
     total_customers = len(MOCK_USERS)
     total_premiums = 0
     risk_distribution = {"excellent": 0, "good": 0, "average": 0, "high_risk": 0}
     
-    customer_details = []
-    
-    for user_id, user_data in MOCK_USERS.items():
-        # Get scores for each user
-        risk_data = get_mock_risk_score(user_id)
-        safety_data = get_mock_safety_score(user_id)
-        
-        # Calculate premium based on risk
-        base_premium = 120
-        risk_score = risk_data["overall_score"]
-        discount_percent = round((1 - risk_score) * 25)
-        current_premium = round(base_premium * (1 - discount_percent / 100))
-        total_premiums += current_premium
-        
-        # Determine risk tier
-        if risk_score < 0.2:
-            tier = "excellent"
-        elif risk_score < 0.25:
-            tier = "good" 
-        elif risk_score < 0.35:
-            tier = "average"
-        else:
-            tier = "high_risk"
-        
-        risk_distribution[tier] += 1
-        
-        customer_details.append({
-            "id": user_id,
-            "name": user_data["name"],
-            "vehicle": user_data["vehicle"],
-            "location": user_data["location"],
-            "risk_score": risk_score,
-            "safety_score": round(safety_data["overall_score"]),
-            "current_premium": current_premium,
-            "standard_premium": base_premium,
-            "discount_percent": discount_percent if discount_percent > 0 else 0,
-            "surcharge_percent": abs(discount_percent) if discount_percent < 0 else 0,
-            "risk_tier": tier,
-            "months_tracked": random.randint(6, 12),
-            "total_trips": random.randint(150, 500),
-            "claims": 1 if tier == "high_risk" and random.random() < 0.3 else 0,
-            "last_update": datetime.now().date().isoformat()
-        })
+    for customer in customer_details:
+        total_premiums += customer["current_premium"]
+        risk_distribution[customer["risk_tier"]] += 1
     
     return {
         "company": "Insurance Co.",
@@ -664,10 +742,10 @@ async def get_insurance_portfolio():
         "profit_margin": 0.24,
         "risk_distribution": risk_distribution,
         "customers": customer_details,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": fast_iso()
     }
 
-@app.get("/api/v1/insurance/analytics", response_model=Dict[str, Any])
+@app.get("/api/v1/insurance/analytics")
 async def get_insurance_analytics():
     """
     Advanced analytics for State Farm presentation
@@ -708,10 +786,10 @@ async def get_insurance_analytics():
             "high_risk_customer_identification": 94,
             "proactive_intervention_success": 82
         },
-        "timestamp": datetime.now().isoformat()
+        "timestamp": fast_iso()
     }
 
-@app.get("/api/v1/vehicle-safety/{user_id}", response_model=Dict[str, Any])
+@app.get("/api/v1/vehicle-safety/{user_id}")
 async def get_vehicle_safety(user_id: str):
     """
     Get NHTSA safety rating for user's vehicle
@@ -733,17 +811,18 @@ async def get_vehicle_safety(user_id: str):
         make = "Honda"
         model = "Civic"
     
-    # Get NHTSA safety data
-    safety_data = nhtsa.get_vehicle_safety_rating(year, make, model)
+    # Get NHTSA safety data without blocking the event loop; copy so the
+    # user context below never leaks into the memoized result
+    safety_data = dict(await asyncio.to_thread(_nhtsa_lookup, year, make, model))
     
     # Add user context
     safety_data["user_id"] = user_id
     safety_data["user_vehicle"] = user_data["vehicle"]
-    safety_data["timestamp"] = datetime.now().isoformat()
+    safety_data["timestamp"] = fast_iso()
     
     return safety_data
 
-@app.get("/api/v1/enhanced-risk-score/{user_id}", response_model=Dict[str, Any])
+@app.get("/api/v1/enhanced-risk-score/{user_id}")
 async def get_enhanced_risk_score(user_id: str):
     """
     Get risk score enhanced with NHTSA safety data
@@ -775,27 +854,37 @@ async def get_enhanced_risk_score(user_id: str):
         },
         "risk_improvement": f"{((base_risk['overall_score'] - enhanced_score) / base_risk['overall_score'] * 100):.1f}%",
         "data_sources": ["Driving Behavior", "TomTom Traffic", "NHTSA Safety Database"],
-        "timestamp": datetime.now().isoformat()
+        "timestamp": fast_iso()
     }
 
-@app.get("/api/v1/live-data-status", response_model=Dict[str, Any])
+# Congestion levels reported per city by the live data status endpoint
+_CONGESTION = ("Light", "Moderate", "Heavy")
+_CITY_CONGESTION = (
+    ("san_francisco", _CONGESTION),
+    ("austin", _CONGESTION),
+    ("seattle", _CONGESTION),
+    ("new_york", ("Light", "Heavy", "Severe")),
+    ("denver", _CONGESTION),
+)
+_CONGESTION_INDEX = range(len(_CONGESTION))
+
+@app.get("/api/v1/live-data-status")
 async def get_live_data_status():
     """
     Get current live data streaming status and simulate real-time changes
     """
     # Simulate slight variations in traffic conditions
     traffic_multiplier = random.uniform(0.95, 1.15)  # ±15% variation
-    current_time = datetime.now()
+    
+    # One draw for all cities; each city maps the index onto its own levels
+    congestion_picks = random.choices(_CONGESTION_INDEX, k=len(_CITY_CONGESTION))
     
     return {
         "live_mode": True,
-        "last_update": current_time.isoformat(),
+        "last_update": fast_iso(),
         "traffic_conditions": {
-            "san_francisco": random.choice(["Light", "Moderate", "Heavy"]),
-            "austin": random.choice(["Light", "Moderate", "Heavy"]),
-            "seattle": random.choice(["Light", "Moderate", "Heavy"]),
-            "new_york": random.choice(["Light", "Heavy", "Severe"]),
-            "denver": random.choice(["Light", "Moderate", "Heavy"]),
+            city: levels[pick]
+            for (city, levels), pick in zip(_CITY_CONGESTION, congestion_picks)
         },
         "active_incidents": random.randint(2, 8),
         "weather_alerts": random.randint(0, 3),
@@ -814,4 +903,14 @@ if __name__ == "__main__":
     print("🚗 Starting DriveWise AI Backend...")
     print("📊 Dashboard will be available at: http://localhost:3000")
     print("🔗 API documentation at: http://localhost:8000/docs")
-    uvicorn.run(app, host="0.0.0.0", port=8002, reload=True)
\ No newline at end of file
+    # Workers need an import string; use `uvicorn simple_main:app --reload` for development.
+    # "auto" picks uvloop/httptools when installed and falls back to asyncio/h11 under PyPy.
+    uvicorn.run(
+        "simple_main:app",
+        host="0.0.0.0",
+        port=8002,
+        loop="auto",
+        http="auto",
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        limit_concurrency=1000
+    )
\ No newline at end of file
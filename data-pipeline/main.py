@@ -1,17 +1,29 @@
 import os
 import sys
+import json
+import asyncio
 import logging
-import schedule
-import time
+import httpx
+import signal
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict
 from datetime import datetime
-from typing import List, Tuple
+from typing import Any, Callable, Iterator, List, Tuple
 
 # Add the parent directory to the path to import our modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from tomtom_connector import DataIngestionPipeline
+from tomtom_connector import DataIngestionPipeline, TrafficData
 from nhtsa_connector import VehicleDataPipeline
 from bigquery_uploader import BigQueryUploader
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor as SchedulerThreadPoolExecutor
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from pybreaker import CircuitBreakerError
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +37,39 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# BigQuery caps insert requests at 50,000 rows / 10 MB; stay well inside both
+UPLOAD_CHUNK_ROWS = 500
+UPLOAD_CHUNK_BYTES = 9 * 1024 * 1024
+UPLOAD_WORKERS = 4
+
+# Upper bound on VINs looked up per vehicle tick; the oldest are dropped beyond it
+MAX_VINS_PER_TICK = int(os.getenv("MAX_VINS_PER_TICK", "1000"))
+
+def _chunk_records(records: List[Any], max_rows: int = UPLOAD_CHUNK_ROWS,
+                   max_bytes: int = UPLOAD_CHUNK_BYTES) -> Iterator[List[Any]]:
+    """Split dataclass records into chunks bounded by row count and serialized size"""
+    chunk = []
+    chunk_bytes = 0
+    
+    for record in records:
+        record_bytes = len(json.dumps(asdict(record), default=str))
+        if chunk and (len(chunk) >= max_rows or chunk_bytes + record_bytes > max_bytes):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        
+        chunk.append(record)
+        chunk_bytes += record_bytes
+    
+    if chunk:
+        yield chunk
+
+def _is_retryable(error: BaseException) -> bool:
+    """Retry throttling, server errors, timeouts and connection failures, but not other 4xx"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
 class DataPipelineOrchestrator:
     """Main orchestrator for the DriveWise AI data pipeline"""
     
@@ -34,7 +79,7 @@ class DataPipelineOrchestrator:
         self.bigquery_uploader = BigQueryUploader()
         
         # Define major cities for traffic data collection
-        self.target_cities = [
+        target_cities = [
             (37.7749, -122.4194, "San Francisco"),
             (34.0522, -118.2437, "Los Angeles"),
             (40.7128, -74.0060, "New York"),
@@ -46,31 +91,27 @@ class DataPipelineOrchestrator:
             (37.4419, -122.1430, "Palo Alto"),
             (47.6062, -122.3321, "Seattle")
         ]
+        
+        # Stored column-wise so coordinates can be handed to batched calls as arrays
+        lats, lons, names = zip(*target_cities)
+        self.city_lats = np.array(lats, dtype=np.float64)
+        self.city_lons = np.array(lons, dtype=np.float64)
+        self.city_names = np.array(names, dtype=object)
+    
+    def close(self):
+        """Release both pipelines' connections and flush the NHTSA cache"""
+        self.vehicle_pipeline.close()
+        self.traffic_pipeline.tomtom.close()
     
     def collect_traffic_data(self):
         """Collect traffic data for all target cities"""
         try:
             logger.info("Starting traffic data collection...")
-            all_traffic_data = []
-            
-            for lat, lon, city_name in self.target_cities:
-                logger.info(f"Collecting traffic data for {city_name}")
-                
-                # Collect traffic data for the city
-                traffic_data = self.traffic_pipeline.tomtom.get_traffic_flow(lat, lon)
-                
-                # Add city name to the data
-                for data_point in traffic_data:
-                    data_point.city = city_name
-                
-                all_traffic_data.extend(traffic_data)
-                
-                # Small delay between cities to respect rate limits
-                time.sleep(2)
+            all_traffic_data = asyncio.run(self._collect_traffic_async())
             
             # Upload to BigQuery
             if all_traffic_data:
-                success = self.bigquery_uploader.upload_traffic_data(all_traffic_data)
+                success = self._upload_in_chunks(self.traffic_pipeline.upload_traffic_records, all_traffic_data)
                 if success:
                     logger.info(f"Successfully uploaded {len(all_traffic_data)} traffic records")
                 else:
@@ -81,6 +122,61 @@ class DataPipelineOrchestrator:
         except Exception as e:
             logger.error(f"Error in traffic data collection: {e}")
     
+    def _upload_in_chunks(self, upload: Callable[[List[Any]], bool], records: List[Any]) -> bool:
+        """Upload records in bounded chunks on a small thread pool; True if every chunk succeeded"""
+        failed_rows = 0
+        
+        with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+            futures = {executor.submit(upload, chunk): len(chunk) for chunk in _chunk_records(records)}
+            
+            for future in as_completed(futures):
+                try:
+                    if not future.result():
+                        failed_rows += futures[future]
+                except Exception as e:
+                    logger.error(f"Error uploading chunk of {futures[future]} records: {e}")
+                    failed_rows += futures[future]
+        
+        if failed_rows:
+            logger.error(f"{failed_rows}/{len(records)} records failed to upload")
+        return failed_rows == 0
+    
+    async def _collect_traffic_async(self) -> List[TrafficData]:
+        """Fetch all target cities concurrently over one HTTP/2 client"""
+        # Bounded concurrency replaces the fixed delay between cities; the connector enforces the request rate
+        semaphore = asyncio.Semaphore(4)
+        polled_at = datetime.utcnow()
+        
+        async with self.traffic_pipeline.tomtom.open_async_client() as client:
+            results = await asyncio.gather(*[
+                self._fetch_city(client, semaphore, lat, lon, city_name, polled_at)
+                for lat, lon, city_name in zip(
+                    self.city_lats.tolist(), self.city_lons.tolist(), self.city_names.tolist()
+                )
+            ])
+        
+        return [data_point for city_data in results for data_point in city_data]
+    
+    async def _fetch_city(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                          lat: float, lon: float, city_name: str, polled_at: datetime) -> List[TrafficData]:
+        """Collect traffic data for a single city"""
+        logger.info(f"Collecting traffic data for {city_name}")
+        try:
+            return await self._fetch_city_flow(client, semaphore, lat, lon, city_name, polled_at)
+        except (httpx.HTTPError, CircuitBreakerError) as e:
+            logger.error(f"Error collecting traffic data for {city_name}: {e}")
+            return []
+    
+    @retry(wait=wait_exponential(multiplier=0.5, max=30), stop=stop_after_attempt(5),
+           retry=retry_if_exception(_is_retryable), reraise=True)
+    async def _fetch_city_flow(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                               lat: float, lon: float, city_name: str, polled_at: datetime) -> List[TrafficData]:
+        """One flow request; the concurrency slot is released between retries"""
+        async with semaphore:
+            return await self.traffic_pipeline.tomtom.get_traffic_flow_async(
+                client, lat, lon, city=city_name, timestamp=polled_at
+            )
+    
     def process_vehicle_data(self, vins: List[str] = None):
         """Process vehicle safety data"""
         try:
@@ -94,10 +190,15 @@ class DataPipelineOrchestrator:
                     "JTDKN3DU0A0123456",  # Sample Toyota VIN
                 ]
             
-            vehicle_data = self.vehicle_pipeline.process_vehicle_batch(vins[:10])  # Limit batch size
+            if len(vins) > MAX_VINS_PER_TICK:
+                logger.warning(f"Dropping {len(vins) - MAX_VINS_PER_TICK} oldest VINs over the per-tick limit")
+                vins = vins[-MAX_VINS_PER_TICK:]
+            
+            # The batch is looked up concurrently, bounded inside the vehicle pipeline
+            vehicle_data = self.vehicle_pipeline.process_vehicle_batch(vins)
             
             if vehicle_data:
-                success = self.bigquery_uploader.upload_vehicle_data(vehicle_data)
+                success = self._upload_in_chunks(self.vehicle_pipeline.upload_vehicle_data, vehicle_data)
                 if success:
                     logger.info(f"Successfully processed {len(vehicle_data)} vehicles")
                 else:
@@ -125,7 +226,7 @@ class DataPipelineOrchestrator:
             logger.error(f"Error in ML model updates: {e}")
     
     def run_full_pipeline(self):
-        """Run the complete data pipeline"""
+        """Run every pipeline stage once; the scheduler owns their recurring cadence"""
         start_time = datetime.now()
         logger.info("=== Starting Full Data Pipeline ===")
         
@@ -133,13 +234,11 @@ class DataPipelineOrchestrator:
             # Collect traffic data
             self.collect_traffic_data()
             
-            # Process vehicle data (less frequently)
-            if datetime.now().hour % 6 == 0:  # Every 6 hours
-                self.process_vehicle_data()
+            # Process vehicle data
+            self.process_vehicle_data()
             
-            # Update ML models (once per hour)
-            if datetime.now().minute == 0:
-                self.update_ml_models()
+            # Update ML models
+            self.update_ml_models()
             
             duration = datetime.now() - start_time
             logger.info(f"=== Pipeline completed in {duration} ===")
@@ -151,20 +250,27 @@ def setup_scheduler():
     """Setup the pipeline scheduler"""
     orchestrator = DataPipelineOrchestrator()
     
+    # Jobs run on worker threads so a slow traffic tick cannot delay the others;
+    # overdue runs are coalesced and a job never overlaps with itself
+    scheduler = BackgroundScheduler(
+        executors={"default": SchedulerThreadPoolExecutor(8)},
+        job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 300}
+    )
+    
     # Schedule traffic data collection every 15 minutes
-    schedule.every(15).minutes.do(orchestrator.collect_traffic_data)
+    scheduler.add_job(orchestrator.collect_traffic_data, IntervalTrigger(minutes=15),
+                      id="collect_traffic_data")
     
     # Schedule vehicle data processing every 6 hours
-    schedule.every(6).hours.do(orchestrator.process_vehicle_data)
+    scheduler.add_job(orchestrator.process_vehicle_data, CronTrigger(hour="*/6", minute=0),
+                      id="process_vehicle_data")
     
     # Schedule ML model updates every hour
-    schedule.every().hour.do(orchestrator.update_ml_models)
-    
-    # Schedule full pipeline run every 30 minutes
-    schedule.every(30).minutes.do(orchestrator.run_full_pipeline)
+    scheduler.add_job(orchestrator.update_ml_models, CronTrigger(minute=0),
+                      id="update_ml_models")
     
     logger.info("Pipeline scheduler configured")
-    return orchestrator
+    return orchestrator, scheduler
 
 def main():
     """Main function"""
@@ -173,8 +279,14 @@ def main():
     # Setup environment
     os.makedirs('/app/logs', exist_ok=True)
     
+    # SIGTERM (docker stop) and Ctrl-C both wake the main thread for a clean shutdown
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    
+    orchestrator = None
+    scheduler = None
     try:
-        orchestrator = setup_scheduler()
+        orchestrator, scheduler = setup_scheduler()
         
         # Run initial pipeline
         logger.info("Running initial pipeline...")
@@ -182,15 +294,23 @@ def main():
         
         # Start scheduler
         logger.info("Starting pipeline scheduler...")
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+        scheduler.start()
+        
+        # Jobs run on the scheduler's threads; the main thread sleeps until signalled
+        stop_event.wait()
+        logger.info("Pipeline stopped by signal")
             
     except KeyboardInterrupt:
         logger.info("Pipeline stopped by user")
     except Exception as e:
         logger.error(f"Fatal error in pipeline: {e}")
         sys.exit(1)
+    finally:
+        if scheduler and scheduler.running:
+            # Let in-flight jobs finish so no partial upload is abandoned
+            scheduler.shutdown(wait=True)
+        if orchestrator is not None:
+            orchestrator.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,92 @@
+import sqlite3
+import orjson
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "/app/cache/nhtsa.db"
+
+class NHTSACache:
+    """SQLite-backed store for NHTSA lookups that survives pipeline restarts"""
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("NHTSA_CACHE_PATH", DEFAULT_CACHE_PATH)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        
+        # Reads share one connection; WAL keeps them from blocking on the writer
+        self._conn = self._connect()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vehicle_cache (key TEXT PRIMARY KEY, payload BLOB, ts INTEGER)"
+        )
+        self._read_lock = threading.Lock()
+        
+        # Writes go through a single background thread so lookups never wait on disk; None stops it
+        self._writes: "queue.Queue[Optional[Tuple[str, bytes, int]]]" = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="nhtsa-cache-writer", daemon=True)
+        self._writer.start()
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def get(self, key: str, ttl: int, default: Any = None) -> Any:
+        """Return the stored value for key if it is younger than ttl seconds"""
+        with self._read_lock:
+            row = self._conn.execute("SELECT payload, ts FROM vehicle_cache WHERE key = ?", (key,)).fetchone()
+        
+        if row is None or time.time() - row[1] > ttl:
+            return default
+        
+        return orjson.loads(row[0])
+    
+    def put(self, key: str, value: Any):
+        """Queue a value for storage"""
+        self._writes.put((key, orjson.dumps(value), int(time.time())))
+    
+    def close(self):
+        """Flush queued writes, stop the writer and close both connections"""
+        if self._closed:
+            return
+        self._closed = True
+        
+        self._writes.put(None)
+        self._writer.join()
+        with self._read_lock:
+            self._conn.close()
+    
+    def _write_loop(self):
+        """Drain queued writes in batches, one transaction per batch, until close() queues None"""
+        conn = self._connect()
+        stopping = False
+        
+        while not stopping:
+            entry = self._writes.get()
+            if entry is None:
+                break
+            
+            batch: List[Tuple[str, bytes, int]] = [entry]
+            while True:
+                try:
+                    entry = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+            
+            try:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO vehicle_cache (key, payload, ts) VALUES (?, ?, ?)", batch)
+            except sqlite3.Error as e:
+                logger.error(f"Error persisting {len(batch)} NHTSA cache entries: {e}")
+        
+        conn.close()
@@ -1,15 +1,58 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import httpx
+import asyncio
+import re
 import json
+import orjson
+import ijson
 import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from operator import attrgetter
+from cachetools import TTLCache, cachedmethod
+from cachetools.keys import hashkey
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import os
-from dataclasses import dataclass
+import sqlite3
+from dataclasses import asdict, dataclass
+from google.cloud import bigquery
+from nhtsa_cache import NHTSACache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Cache sizing: ratings and recall campaigns rarely change, per-VIN recall status may
+CACHE_MAXSIZE = 4096
+LOOKUP_CACHE_TTL = 86400  # seconds
+VIN_RECALL_CACHE_TTL = 3600  # seconds
+
+# On-disk entries outlive restarts; decoded VINs and ratings are effectively static
+PERSISTED_DECODE_TTL = 7 * 86400  # seconds
+PERSISTED_SAFETY_TTL = 7 * 86400  # seconds
+PERSISTED_RECALL_TTL = 86400  # seconds
+
+# Recall dumps larger than this are stream-parsed instead of loaded whole
+RECALL_STREAM_THRESHOLD = 1024 * 1024  # bytes
+
+_MISSING = object()
+
+# DecodeVin returns 100+ variables; these are the only ones we read
+_DECODE_FIELDS = frozenset({"Make", "Model", "Model Year"})
+
+# 17 characters, digits and capitals except I, O and Q
+_VIN_RE = re.compile(r"[A-HJ-NPR-Z0-9]{17}")
+
+# HTTP/2 lets the per-VIN decode, safety and recall requests multiplex over a few connections
+ASYNC_CLIENT_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+ASYNC_CLIENT_TIMEOUT = 30  # seconds
+
+# Below this many VINs, process pool startup costs more than the decode parsing it offloads
+PROCESS_POOL_MIN_BATCH = 32
+
+@dataclass(frozen=True, slots=True)
 class VehicleData:
     make: str
     model: str
@@ -21,29 +64,165 @@ class VehicleData:
     timestamp: datetime
     source: str = "nhtsa"
 
+# Load-job schema for VehicleData uploads; matches drivewise_ai.vehicle_data
+VEHICLE_BIGQUERY_SCHEMA = [
+    bigquery.SchemaField("make", "STRING"),
+    bigquery.SchemaField("model", "STRING"),
+    bigquery.SchemaField("year", "INTEGER"),
+    bigquery.SchemaField("vin", "STRING", mode="REQUIRED"),
+    bigquery.SchemaField("safety_rating", "FLOAT"),
+    bigquery.SchemaField("recall_count", "INTEGER"),
+    bigquery.SchemaField("crash_test_rating", "JSON"),
+    bigquery.SchemaField("timestamp", "TIMESTAMP"),
+    bigquery.SchemaField("source", "STRING"),
+]
+
+def _normalize_vin(vin: Any) -> Optional[str]:
+    """Canonical upper-case VIN, or None for anything that is not a well-formed VIN string"""
+    if not isinstance(vin, str):
+        return None
+    vin = vin.strip().upper()
+    return vin if _VIN_RE.fullmatch(vin) else None
+
+def _parse_decode(body: bytes) -> Optional[Dict[str, str]]:
+    """Parse a DecodeVin response down to the variables we read; module-level so it pickles"""
+    data = orjson.loads(body)
+    
+    if "Results" in data and len(data["Results"]) > 0:
+        return {item["Variable"]: item["Value"] for item in data["Results"] if item["Variable"] in _DECODE_FIELDS}
+    
+    return None
+
+def _parse_safety_rating(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Extract the crash test ratings from a SafetyRatings response"""
+    if "Results" in data and len(data["Results"]) > 0:
+        result = data["Results"][0]
+        
+        return {
+            "overall_rating": float(result.get("OverallRating", 0)) if result.get("OverallRating") else None,
+            "rollover_rating": float(result.get("RolloverRating", 0)) if result.get("RolloverRating") else None,
+            "front_crash_rating": float(result.get("OverallFrontCrashRating", 0)) if result.get("OverallFrontCrashRating") else None,
+            "side_crash_rating": float(result.get("OverallSideCrashRating", 0)) if result.get("OverallSideCrashRating") else None,
+            "vehicle_id": result.get("VehicleId"),
+            "vehicle_description": result.get("VehicleDescription")
+        }
+    
+    return None
+
+def _parse_recall_count(data: Dict[str, Any]) -> int:
+    """Count the recalls in a recallsByVehicle response"""
+    if "results" in data:
+        return len(data["results"])
+    
+    return 0
+
+def _parse_recall(recall: Dict[str, Any]) -> Dict[str, Any]:
+    """Map one recallsByVehicle result to our recall record"""
+    return {
+        "recall_number": recall.get("NHTSACampaignNumber"),
+        "recall_date": recall.get("ReportReceivedDate"),
+        "component": recall.get("Component"),
+        "summary": recall.get("Summary"),
+        "consequence": recall.get("Consequence"),
+        "remedy": recall.get("Remedy"),
+        "manufacturer": recall.get("Manufacturer")
+    }
+
+def _build_vehicle_data(vin: str, results: Dict[str, Any], safety_rating: Optional[Dict[str, Any]],
+                        recall_count: int) -> VehicleData:
+    """Assemble VehicleData from decoded VIN variables and the follow-up lookups"""
+    year_str = results.get("Model Year") or ""
+    
+    return VehicleData(
+        make=results.get("Make", "Unknown"),
+        model=results.get("Model", "Unknown"),
+        year=int(year_str) if year_str.isdecimal() and 1900 <= int(year_str) <= 2100 else 0,
+        vin=vin,
+        safety_rating=safety_rating.get("overall_rating") if safety_rating else None,
+        recall_count=recall_count,
+        crash_test_rating=safety_rating,
+        timestamp=datetime.utcnow()
+    )
+
 class NHTSAConnector:
     """NHTSA Vehicle Safety API Connector"""
     
+    # Shared by every request that only asks for JSON; never mutated
+    _JSON_PARAMS = {"format": "json"}
+    
     def __init__(self):
         self.base_url = "https://vpic.nhtsa.dot.gov/api/vehicles"
         self.recall_url = "https://api.nhtsa.gov/recalls/recallsByVehicle"
         self.safety_url = "https://api.nhtsa.gov/SafetyRatings"
         
+        # Endpoint prefixes, built once instead of per request
+        self._decode_prefix = self.base_url + "/DecodeVin/"
+        self._models_prefix = self.base_url + "/GetModelsForMake/"
+        self._safety_prefix = self.safety_url + "/modelyear/"
+        
+        # Pooled keep-alive session shared by every lookup
+        self.session = requests.Session()
+        retries = Retry(total=3, status_forcelist=[429, 500, 502, 503, 504], backoff_factor=0.5)
+        self.session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retries))
+        
+        # Make/model/year lookups repeat across VINs; only successful responses are cached
+        self._cache_lock = threading.Lock()
+        self._safety_cache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=LOOKUP_CACHE_TTL)
+        self._recalls_cache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=LOOKUP_CACHE_TTL)
+        self._models_cache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=LOOKUP_CACHE_TTL)
+        self._recall_count_cache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=VIN_RECALL_CACHE_TTL)
+        self._pending_safety: Dict[tuple, asyncio.Future] = {}
+        
+        # Persistent layer behind the in-memory caches; lookups still work without it
+        try:
+            self.persistent_cache = NHTSACache()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"NHTSA persistent cache unavailable, continuing without it: {e}")
+            self.persistent_cache = None
+    
+    def close(self):
+        """Release pooled connections and flush the persistent cache"""
+        self.session.close()
+        if self.persistent_cache is not None:
+            self.persistent_cache.close()
+            self.persistent_cache = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _load_persisted(self, key: str, ttl: int) -> Any:
+        """Persisted value for key, or _MISSING"""
+        if self.persistent_cache is None:
+            return _MISSING
+        return self.persistent_cache.get(key, ttl, _MISSING)
+    
+    def _persist(self, key: str, value: Any):
+        if self.persistent_cache is not None:
+            self.persistent_cache.put(key, value)
+    
     def get_vehicle_info(self, vin: str) -> Optional[VehicleData]:
         """Get vehicle information by VIN"""
+        normalized = _normalize_vin(vin)
+        if normalized is None:
+            logger.warning(f"Skipping malformed VIN {vin!r}")
+            return None
+        vin = normalized
+        
         try:
             # Decode VIN
-            url = f"{self.base_url}/DecodeVin/{vin}"
-            params = {"format": "json"}
-            
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if "Results" in data and len(data["Results"]) > 0:
-                results = {item["Variable"]: item["Value"] for item in data["Results"]}
+            results = self._load_persisted("decode:" + vin, PERSISTED_DECODE_TTL)
+            if results is _MISSING:
+                response = self.session.get(self._decode_prefix + vin, params=self._JSON_PARAMS, timeout=30)
+                response.raise_for_status()
                 
+                results = _parse_decode(response.content)
+                if results is not None:
+                    self._persist("decode:" + vin, results)
+            
+            if results is not None:
                 # Get additional safety data
                 safety_rating = self.get_safety_rating(
                     results.get("Make", ""),
@@ -54,18 +233,7 @@ class NHTSAConnector:
                 # Get recall information
                 recall_count = self.get_recall_count(vin)
                 
-                vehicle_data = VehicleData(
-                    make=results.get("Make", "Unknown"),
-                    model=results.get("Model", "Unknown"),
-                    year=int(results.get("Model Year", "0")) if results.get("Model Year", "").isdigit() else 0,
-                    vin=vin,
-                    safety_rating=safety_rating.get("overall_rating") if safety_rating else None,
-                    recall_count=recall_count,
-                    crash_test_rating=safety_rating,
-                    timestamp=datetime.utcnow()
-                )
-                
-                return vehicle_data
+                return _build_vehicle_data(vin, results, safety_rating, recall_count)
             
             return None
             
@@ -79,27 +247,7 @@ class NHTSAConnector:
     def get_safety_rating(self, make: str, model: str, year: str) -> Optional[Dict[str, Any]]:
         """Get safety rating for a vehicle"""
         try:
-            url = f"{self.safety_url}/modelyear/{year}/make/{make}/model/{model}"
-            params = {"format": "json"}
-            
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if "Results" in data and len(data["Results"]) > 0:
-                result = data["Results"][0]
-                
-                return {
-                    "overall_rating": float(result.get("OverallRating", 0)) if result.get("OverallRating") else None,
-                    "rollover_rating": float(result.get("RolloverRating", 0)) if result.get("RolloverRating") else None,
-                    "front_crash_rating": float(result.get("OverallFrontCrashRating", 0)) if result.get("OverallFrontCrashRating") else None,
-                    "side_crash_rating": float(result.get("OverallSideCrashRating", 0)) if result.get("OverallSideCrashRating") else None,
-                    "vehicle_id": result.get("VehicleId"),
-                    "vehicle_description": result.get("VehicleDescription")
-                }
-            
-            return None
+            return self._fetch_safety_rating(make, model, year)
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching safety rating for {year} {make} {model}: {e}")
@@ -111,21 +259,7 @@ class NHTSAConnector:
     def get_recall_count(self, vin: str) -> int:
         """Get number of recalls for a vehicle"""
         try:
-            url = f"{self.recall_url}"
-            params = {
-                "vin": vin,
-                "format": "json"
-            }
-            
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if "results" in data:
-                return len(data["results"])
-            
-            return 0
+            return self._fetch_recall_count(vin)
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching recalls for VIN {vin}: {e}")
@@ -134,36 +268,177 @@ class NHTSAConnector:
             logger.error(f"Unexpected error fetching recalls: {e}")
             return 0
     
-    def get_recalls_by_make_model_year(self, make: str, model: str, year: int) -> List[Dict[str, Any]]:
-        """Get recalls for a specific make/model/year"""
+    @cachedmethod(attrgetter("_safety_cache"), lock=attrgetter("_cache_lock"))
+    def _fetch_safety_rating(self, make: str, model: str, year: str) -> Optional[Dict[str, Any]]:
+        """Fetch and parse a safety rating; raises on request errors so failures are not cached"""
+        persisted_key = f"safety:{year}/{make}/{model}"
+        safety_rating = self._load_persisted(persisted_key, PERSISTED_SAFETY_TTL)
+        if safety_rating is not _MISSING:
+            return safety_rating
+        
+        url = f"{self._safety_prefix}{year}/make/{make}/model/{model}"
+        
+        response = self.session.get(url, params=self._JSON_PARAMS, timeout=30)
+        response.raise_for_status()
+        
+        safety_rating = _parse_safety_rating(orjson.loads(response.content))
+        self._persist(persisted_key, safety_rating)
+        return safety_rating
+    
+    @cachedmethod(attrgetter("_recall_count_cache"), lock=attrgetter("_cache_lock"))
+    def _fetch_recall_count(self, vin: str) -> int:
+        """Fetch the recall count for a VIN; raises on request errors so failures are not cached"""
+        recall_count = self._load_persisted("recalls:" + vin, PERSISTED_RECALL_TTL)
+        if recall_count is not _MISSING:
+            return recall_count
+        
+        url = f"{self.recall_url}"
+        params = {
+            "vin": vin,
+            "format": "json"
+        }
+        
+        response = self.session.get(url, params=params, timeout=30)
+        response.raise_for_status()
+        
+        recall_count = _parse_recall_count(orjson.loads(response.content))
+        self._persist("recalls:" + vin, recall_count)
+        return recall_count
+    
+    async def get_vehicle_info_async(self, client: httpx.AsyncClient, vin: str,
+                                     parse_pool: Optional[ProcessPoolExecutor] = None) -> Optional[VehicleData]:
+        """Async variant of get_vehicle_info; safety and recall lookups run concurrently"""
         try:
-            url = f"{self.recall_url}"
-            params = {
-                "make": make,
-                "model": model,
-                "modelYear": year,
-                "format": "json"
-            }
+            results = self._load_persisted("decode:" + vin, PERSISTED_DECODE_TTL)
+            if results is _MISSING:
+                body = await self._get_bytes_async(client, self._decode_prefix + vin, self._JSON_PARAMS)
+                
+                # Large batches parse the 100+ variable decode payloads off the event loop's GIL
+                if parse_pool is not None:
+                    results = await asyncio.get_running_loop().run_in_executor(parse_pool, _parse_decode, body)
+                else:
+                    results = _parse_decode(body)
+                if results is not None:
+                    self._persist("decode:" + vin, results)
             
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
+            if results is not None:
+                # Both follow-up lookups only depend on the decoded VIN
+                safety_rating, recall_count = await asyncio.gather(
+                    self._get_safety_rating_async(
+                        client,
+                        results.get("Make", ""),
+                        results.get("Model", ""),
+                        results.get("Model Year", "")
+                    ),
+                    self._get_recall_count_async(client, vin)
+                )
+                
+                return _build_vehicle_data(vin, results, safety_rating, recall_count)
+            
+            return None
             
-            data = response.json()
-            recalls = []
+        except httpx.HTTPError as e:
+            logger.error(f"Error fetching NHTSA vehicle data for VIN {vin}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error fetching vehicle data: {e}")
+            return None
+    
+    async def _get_safety_rating_async(self, client: httpx.AsyncClient,
+                                       make: str, model: str, year: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get_safety_rating, sharing its cache"""
+        key = hashkey(make, model, year)
+        with self._cache_lock:
+            cached = self._safety_cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        
+        # VINs of the same vehicle in one batch share a single in-flight request
+        task = self._pending_safety.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_safety_rating_async(client, key, make, model, year))
+            self._pending_safety[key] = task
+            task.add_done_callback(lambda _: self._pending_safety.pop(key, None))
+        
+        return await asyncio.shield(task)
+    
+    async def _fetch_safety_rating_async(self, client: httpx.AsyncClient, key: tuple,
+                                         make: str, model: str, year: str) -> Optional[Dict[str, Any]]:
+        """Fetch a safety rating and cache it on success"""
+        try:
+            persisted_key = f"safety:{year}/{make}/{model}"
+            safety_rating = self._load_persisted(persisted_key, PERSISTED_SAFETY_TTL)
+            if safety_rating is _MISSING:
+                url = f"{self._safety_prefix}{year}/make/{make}/model/{model}"
+                data = await self._get_json_async(client, url, self._JSON_PARAMS)
+                safety_rating = _parse_safety_rating(data)
+                self._persist(persisted_key, safety_rating)
             
-            if "results" in data:
-                for recall in data["results"]:
-                    recalls.append({
-                        "recall_number": recall.get("NHTSACampaignNumber"),
-                        "recall_date": recall.get("ReportReceivedDate"),
-                        "component": recall.get("Component"),
-                        "summary": recall.get("Summary"),
-                        "consequence": recall.get("Consequence"),
-                        "remedy": recall.get("Remedy"),
-                        "manufacturer": recall.get("Manufacturer")
-                    })
+            with self._cache_lock:
+                self._safety_cache[key] = safety_rating
+            return safety_rating
             
-            return recalls
+        except httpx.HTTPError as e:
+            logger.error(f"Error fetching safety rating for {year} {make} {model}: {e}")
+            return None
+    
+    async def _get_recall_count_async(self, client: httpx.AsyncClient, vin: str) -> int:
+        """Async variant of get_recall_count, sharing its cache"""
+        key = hashkey(vin)
+        with self._cache_lock:
+            cached = self._recall_count_cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        
+        try:
+            recall_count = self._load_persisted("recalls:" + vin, PERSISTED_RECALL_TTL)
+            if recall_count is _MISSING:
+                data = await self._get_json_async(client, self.recall_url, {"vin": vin, "format": "json"})
+                recall_count = _parse_recall_count(data)
+                self._persist("recalls:" + vin, recall_count)
+            
+            with self._cache_lock:
+                self._recall_count_cache[key] = recall_count
+            return recall_count
+            
+        except httpx.HTTPError as e:
+            logger.error(f"Error fetching recalls for VIN {vin}: {e}")
+            return 0
+    
+    async def _get_json_async(self, client: httpx.AsyncClient, url: str,
+                              params: Dict[str, Any]) -> Dict[str, Any]:
+        """GET and parse a JSON document"""
+        return orjson.loads(await self._get_bytes_async(client, url, params))
+    
+    async def _get_bytes_async(self, client: httpx.AsyncClient, url: str,
+                               params: Dict[str, Any], attempts: int = 3) -> bytes:
+        """GET a response body, retrying transient failures with exponential backoff"""
+        for attempt in range(attempts):
+            try:
+                response = await client.get(url, params=params)
+                response.raise_for_status()
+                return response.content
+                    
+            except httpx.HTTPStatusError as e:
+                # Client errors other than throttling will not succeed on retry
+                status = e.response.status_code
+                if (status < 500 and status != 429) or attempt == attempts - 1:
+                    raise
+                delay = 0.5 * 2 ** attempt
+                logger.warning(f"NHTSA returned {status} for {url}, retrying in {delay}s")
+                await asyncio.sleep(delay)
+                
+            except httpx.TransportError as e:
+                if attempt == attempts - 1:
+                    raise
+                delay = 0.5 * 2 ** attempt
+                logger.warning(f"NHTSA request to {url} failed ({e}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+    
+    def get_recalls_by_make_model_year(self, make: str, model: str, year: int) -> List[Dict[str, Any]]:
+        """Get recalls for a specific make/model/year"""
+        try:
+            return list(self._fetch_recalls_by_make_model_year(make, model, year))
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching recalls for {year} {make} {model}: {e}")
@@ -172,6 +447,29 @@ class NHTSAConnector:
             logger.error(f"Unexpected error fetching recalls: {e}")
             return []
     
+    @cachedmethod(attrgetter("_recalls_cache"), lock=attrgetter("_cache_lock"))
+    def _fetch_recalls_by_make_model_year(self, make: str, model: str, year: int) -> List[Dict[str, Any]]:
+        """Fetch recall campaigns for a make/model/year; raises on request errors"""
+        url = f"{self.recall_url}"
+        params = {
+            "make": make,
+            "model": model,
+            "modelYear": year,
+            "format": "json"
+        }
+        
+        with self.session.get(url, params=params, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            
+            # Popular models return hundreds of campaigns; parse those record by record
+            if int(response.headers.get("Content-Length") or 0) > RECALL_STREAM_THRESHOLD:
+                response.raw.decode_content = True
+                return [_parse_recall(recall) for recall in ijson.items(response.raw, "results.item")]
+            
+            data = orjson.loads(response.content)
+        
+        return [_parse_recall(recall) for recall in data.get("results", [])]
+    
     def search_vehicles(self, make: str = None, model: str = None, year: int = None) -> List[Dict[str, Any]]:
         """Search for vehicles by make, model, or year"""
         try:
@@ -179,22 +477,7 @@ class NHTSAConnector:
             
             if make and not model:
                 # Get models for a make
-                url = f"{self.base_url}/GetModelsForMake/{make}"
-                params = {"format": "json"}
-                
-                response = requests.get(url, params=params, timeout=30)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                if "Results" in data:
-                    for result in data["Results"]:
-                        vehicles.append({
-                            "make": result.get("Make_Name"),
-                            "model": result.get("Model_Name"),
-                            "make_id": result.get("Make_ID"),
-                            "model_id": result.get("Model_ID")
-                        })
+                vehicles.extend(self._fetch_models_for_make(make))
             
             elif make and model and year:
                 # Get specific vehicle data
@@ -217,45 +500,132 @@ class NHTSAConnector:
         except Exception as e:
             logger.error(f"Unexpected error searching vehicles: {e}")
             return []
+    
+    @cachedmethod(attrgetter("_models_cache"), lock=attrgetter("_cache_lock"))
+    def _fetch_models_for_make(self, make: str) -> List[Dict[str, Any]]:
+        """Fetch the model list for a make; raises on request errors"""
+        response = self.session.get(self._models_prefix + make, params=self._JSON_PARAMS, timeout=30)
+        response.raise_for_status()
+        
+        data = orjson.loads(response.content)
+        models = []
+        
+        if "Results" in data:
+            for result in data["Results"]:
+                models.append({
+                    "make": result.get("Make_Name"),
+                    "model": result.get("Model_Name"),
+                    "make_id": result.get("Make_ID"),
+                    "model_id": result.get("Model_ID")
+                })
+        
+        return models
 
 class VehicleDataPipeline:
     """Pipeline for processing vehicle safety data"""
     
     def __init__(self):
         self.nhtsa = NHTSAConnector()
+        
+        project_id = os.getenv("GCP_PROJECT_ID")
+        dataset_id = os.getenv("BIGQUERY_DATASET_ID", "drivewise_ai")
+        default_table = f"{project_id}.{dataset_id}.vehicle_data" if project_id else f"{dataset_id}.vehicle_data"
+        self.vehicle_table = os.getenv("BIGQUERY_VEHICLE_TABLE", default_table)
+        self._bigquery_client = None
+    
+    def close(self):
+        """Release the connector's connections and flush its persistent cache"""
+        self.nhtsa.close()
     
     def process_vehicle_batch(self, vins: List[str]) -> List[VehicleData]:
         """Process a batch of VINs"""
-        vehicle_data = []
+        # Malformed VINs would otherwise cost three failed requests each
+        valid_vins = [vin for vin in map(_normalize_vin, vins) if vin is not None]
+        if len(valid_vins) < len(vins):
+            logger.warning(f"Skipping {len(vins) - len(valid_vins)} malformed VINs")
+        vins = valid_vins
         
         logger.info(f"Processing batch of {len(vins)} VINs")
         
-        for i, vin in enumerate(vins):
-            try:
-                data = self.nhtsa.get_vehicle_info(vin)
-                if data:
-                    vehicle_data.append(data)
-                
-                # Log progress
-                if (i + 1) % 10 == 0:
-                    logger.info(f"Processed {i + 1}/{len(vins)} VINs")
-                    
-            except Exception as e:
-                logger.error(f"Error processing VIN {vin}: {e}")
-                continue
+        vehicle_data = asyncio.run(self._process_vehicle_batch_async(vins))
         
         logger.info(f"Successfully processed {len(vehicle_data)} vehicles")
         return vehicle_data
     
+    async def _process_vehicle_batch_async(self, vins: List[str]) -> List[VehicleData]:
+        """Look up all VINs concurrently over one pooled HTTP/2 client"""
+        # Clients are bound to the event loop, so each batch opens its own
+        semaphore = asyncio.Semaphore(20)
+        parse_pool = ProcessPoolExecutor(max_workers=os.cpu_count()) if len(vins) >= PROCESS_POOL_MIN_BATCH else None
+        
+        try:
+            async with httpx.AsyncClient(http2=True, limits=ASYNC_CLIENT_LIMITS,
+                                         timeout=ASYNC_CLIENT_TIMEOUT) as client:
+                async def fetch(vin: str) -> Optional[VehicleData]:
+                    async with semaphore:
+                        return await self.nhtsa.get_vehicle_info_async(client, vin, parse_pool)
+                
+                results = await asyncio.gather(*[fetch(vin) for vin in vins], return_exceptions=True)
+        finally:
+            if parse_pool is not None:
+                parse_pool.shutdown()
+        
+        vehicle_data = []
+        for vin, result in zip(vins, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error processing VIN {vin}: {result}")
+            elif result:
+                vehicle_data.append(result)
+        
+        return vehicle_data
+    
+    def upload_vehicle_data(self, records: List[VehicleData]) -> bool:
+        """Append VehicleData to BigQuery with a single load job; load jobs carry no streaming cost or row quota"""
+        if not records:
+            return True
+        
+        try:
+            if self._bigquery_client is None:
+                self._bigquery_client = bigquery.Client()
+            
+            job_config = bigquery.LoadJobConfig(
+                schema=VEHICLE_BIGQUERY_SCHEMA,
+                write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+            )
+            rows = [{**asdict(record), "timestamp": record.timestamp.isoformat()} for record in records]
+            
+            self._bigquery_client.load_table_from_json(rows, self.vehicle_table, job_config=job_config).result()
+            
+            logger.info(f"Uploaded {len(rows)} vehicle records to {self.vehicle_table}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error uploading vehicle data to BigQuery: {e}")
+            return False
+    
     def enrich_driving_data_with_vehicle_info(self, driving_records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Enrich driving data with vehicle safety information"""
+        # Records share vehicles, so look up each distinct VIN once, concurrently
+        unique_vins = set()
+        for record in driving_records:
+            try:
+                vin = (record.get("vehicle") or {}).get("vin")
+            except Exception:
+                continue  # logged and passed through untouched by the loop below
+            if isinstance(vin, str) and vin:
+                unique_vins.add(vin)
+        unique_vins = list(unique_vins)
+        
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            vehicles = dict(zip(unique_vins, executor.map(self.nhtsa.get_vehicle_info, unique_vins)))
+        
         enriched_records = []
         
         for record in driving_records:
             try:
                 vin = record.get("vehicle", {}).get("vin")
                 if vin:
-                    vehicle_data = self.nhtsa.get_vehicle_info(vin)
+                    vehicle_data = vehicles.get(vin)
                     if vehicle_data:
                         record["vehicle"]["safety_rating"] = vehicle_data.safety_rating
                         record["vehicle"]["recall_count"] = vehicle_data.recall_count
@@ -0,0 +1,57 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Pipeline modules live one level up, next to main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tomtom_connector import DataIngestionPipeline
+
+GRID_SIZE = 5
+RADIUS_KM = 25.0
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setenv("TOMTOM_API_KEY", "test-key")
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    pipeline = DataIngestionPipeline()
+    yield pipeline
+    pipeline.tomtom.close()
+
+def grid_steps(pipeline, center_lat):
+    """(lat_step, lon_step) in degrees of a generated grid"""
+    points = pipeline._generate_grid_points(center_lat, -122.41, RADIUS_KM, grid_size=GRID_SIZE)
+    grid = points.reshape(2 * GRID_SIZE + 1, 2 * GRID_SIZE + 1, 2)
+    return grid[1, 0, 0] - grid[0, 0, 0], grid[0, 1, 1] - grid[0, 0, 1]
+
+def test_grid_is_square_in_km_at_equator(pipeline):
+    lat_step, lon_step = grid_steps(pipeline, 0.0)
+
+    assert lat_step * 111.0 == pytest.approx(RADIUS_KM / GRID_SIZE)
+    assert lon_step * 111.0 == pytest.approx(lat_step * 111.0)
+
+def test_lon_step_doubles_at_60_degrees(pipeline):
+    lat_step, lon_step = grid_steps(pipeline, 60.0)
+
+    assert lon_step == pytest.approx(2 * lat_step)
+
+def assert_valid_coordinates(points):
+    assert np.isfinite(points).all()
+    assert (points[:, 0] >= -90.0).all() and (points[:, 0] <= 90.0).all()
+    assert (points[:, 1] >= -180.0).all() and (points[:, 1] < 180.0).all()
+
+def test_grid_stays_valid_near_pole(pipeline):
+    points = pipeline._generate_grid_points(89.9, -122.41, RADIUS_KM, grid_size=GRID_SIZE)
+    lat_step, lon_step = grid_steps(pipeline, 89.9)
+
+    assert_valid_coordinates(points)
+    assert points[:, 0].max() == 90.0
+    assert lon_step == pytest.approx(RADIUS_KM / 111.0 / GRID_SIZE / 0.01)
+
+def test_grid_wraps_across_antimeridian(pipeline):
+    points = pipeline._generate_grid_points(60.0, 179.9, RADIUS_KM, grid_size=GRID_SIZE)
+
+    assert_valid_coordinates(points)
+    assert (points[:, 1] < 0).any() and (points[:, 1] > 0).any()
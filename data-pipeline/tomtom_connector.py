@@ -1,16 +1,72 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+import httpx
+import asyncio
 import json
+import orjson
+import ijson
+import bisect
+import hashlib
+import io
 import logging
-from typing import Dict, List, Any, Optional
+import math
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pickle
+import pybreaker
+import redis
+import redis.asyncio
+import socket
+import threading
+from aiolimiter import AsyncLimiter
+from google.cloud import bigquery
+from typing import Callable, Dict, Iterator, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import os
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 import time
+from concurrent.futures import ProcessPoolExecutor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+# TomTom request budget; bursts up to this many, refilled at the same rate
+TOMTOM_RATE_LIMIT = 5  # requests per second
+
+# Response cache lifetimes per endpoint: incidents move fastest, routes slowest
+FLOW_CACHE_TTL = 60  # seconds
+INCIDENTS_CACHE_TTL = 30  # seconds
+ROUTE_CACHE_TTL = 120  # seconds
+STALE_CACHE_TTL = 86400  # seconds; last good response, served when TomTom is unreachable
+
+# Region grid points in the same tile share one flowSegmentData call; twice the default
+# 5 km grid step, so a tile holds about four grid points
+FLOW_TILE_KM = 10.0
+
+# Consecutive TomTom failures that open the circuit, and how long it stays open
+BREAKER_FAIL_MAX = 5
+BREAKER_RESET_TIMEOUT = 60  # seconds
+
+# Below this size, shipping an incidents body to a worker process costs more than parsing it inline
+INCIDENTS_PARSE_POOL_MIN_BYTES = 64 * 1024
+
+# Every call goes to one host, so HTTP/2 multiplexes the async fan-out over a connection or two
+ASYNC_CLIENT_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=10)
+ASYNC_CLIENT_TIMEOUT = 30.0  # seconds
+
+# Speed ratio (current / free flow) bands: below 0.4 heavy, below 0.6 moderate, below 0.8 light, else free flow
+_RATIO_THRESHOLDS = (0.4, 0.6, 0.8)
+_CONGESTION_LEVELS = (1.0, 0.6, 0.3, 0.0)
+_RATIO_THRESHOLDS_ARRAY = np.array(_RATIO_THRESHOLDS)
+_CONGESTION_LEVELS_ARRAY = np.array(_CONGESTION_LEVELS)
+
+# Rows per BigQuery load job; each job is a single Parquet upload
+BIGQUERY_UPLOAD_BATCH_SIZE = 500
+
+@dataclass(frozen=True, slots=True)
 class TrafficData:
     location_lat: float
     location_lon: float
@@ -20,141 +76,625 @@ class TrafficData:
     road_type: str
     timestamp: datetime
     source: str = "tomtom"
+    city: Optional[str] = None
+
+# Arrow layout of TrafficData; BigQuery TIMESTAMP columns hold microseconds in UTC
+TRAFFIC_ARROW_SCHEMA = pa.schema([
+    ("location_lat", pa.float64()),
+    ("location_lon", pa.float64()),
+    ("congestion_level", pa.float64()),
+    ("average_speed", pa.float64()),
+    ("incident_count", pa.int64()),
+    ("road_type", pa.string()),
+    ("timestamp", pa.timestamp("us", tz="UTC")),
+    ("source", pa.string()),
+    ("city", pa.string()),
+])
+
+# Load-job schema for row-wise TrafficData uploads; matches drivewise_ai.traffic_data
+TRAFFIC_BIGQUERY_SCHEMA = [
+    bigquery.SchemaField("location_lat", "FLOAT"),
+    bigquery.SchemaField("location_lon", "FLOAT"),
+    bigquery.SchemaField("congestion_level", "FLOAT"),
+    bigquery.SchemaField("average_speed", "FLOAT"),
+    bigquery.SchemaField("incident_count", "INTEGER"),
+    bigquery.SchemaField("road_type", "STRING"),
+    bigquery.SchemaField("timestamp", "TIMESTAMP", mode="REQUIRED"),
+    bigquery.SchemaField("source", "STRING"),
+    bigquery.SchemaField("city", "STRING"),
+]
+
+@dataclass
+class TrafficBatch:
+    """Column-wise traffic records, one array per TrafficData field"""
+    location_lat: np.ndarray
+    location_lon: np.ndarray
+    congestion_level: np.ndarray
+    average_speed: np.ndarray
+    incident_count: np.ndarray
+    road_type: np.ndarray
+    timestamp: np.ndarray  # datetime64[ns]
+    city: np.ndarray
+    source: str = "tomtom"
+    
+    def __len__(self) -> int:
+        return len(self.location_lat)
+    
+    def to_arrow(self) -> pa.RecordBatch:
+        """Arrow view of the batch, columns named and ordered as TrafficData"""
+        n = len(self)
+        columns = {
+            "location_lat": self.location_lat,
+            "location_lon": self.location_lon,
+            "congestion_level": self.congestion_level,
+            "average_speed": self.average_speed,
+            "incident_count": self.incident_count,
+            "road_type": self.road_type.astype(str),
+            "timestamp": self.timestamp.astype("datetime64[us]"),
+            "source": [self.source] * n,
+            "city": self.city,
+        }
+        return pa.RecordBatch.from_arrays(
+            [pa.array(columns[f.name], type=f.type) for f in TRAFFIC_ARROW_SCHEMA], schema=TRAFFIC_ARROW_SCHEMA
+        )
+    
+    def to_records(self) -> List[TrafficData]:
+        """Row-wise TrafficData view for callers that still expect records"""
+        return [
+            TrafficData(lat, lon, congestion, speed, incidents, road_type, timestamp, self.source, city)
+            for lat, lon, congestion, speed, incidents, road_type, timestamp, city in zip(
+                self.location_lat.tolist(), self.location_lon.tolist(), self.congestion_level.tolist(),
+                self.average_speed.tolist(), self.incident_count.tolist(), self.road_type.tolist(),
+                self.timestamp.astype("datetime64[us]").tolist(), self.city.tolist()
+            )
+        ]
+
+# Failures callers handle the same way: the request failed or the circuit is open
+_REQUEST_ERRORS = (requests.exceptions.RequestException, pybreaker.CircuitBreakerError)
+_ASYNC_REQUEST_ERRORS = (httpx.HTTPError, pybreaker.CircuitBreakerError)
+
+def _is_client_error(exc: BaseException) -> bool:
+    """4xx other than 429 means a bad request rather than an unhealthy TomTom, so it must not trip the breaker"""
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status is not None and 400 <= status < 500 and status != 429
+
+def _conditional_headers(validators: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since headers for the validators stored with a cached response"""
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+def _response_validators(headers) -> Dict[str, Optional[str]]:
+    """Validators to store from a response's requests or httpx headers"""
+    return {"etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified")}
+
+def _parse_incident(incident: Dict[str, Any], timestamp: datetime) -> Dict[str, Any]:
+    """Map one incidentDetails item to our incident record"""
+    return {
+        "id": incident.get("id"),
+        "type": incident.get("iconCategory"),
+        "description": incident.get("description"),
+        "severity": incident.get("magnitude", 0),
+        "location": {
+            "lat": incident.get("geometry", {}).get("coordinates", [0, 0])[1],
+            "lon": incident.get("geometry", {}).get("coordinates", [0, 0])[0]
+        },
+        "road": incident.get("roadNumbers", ["Unknown"])[0] if incident.get("roadNumbers") else "Unknown",
+        "timestamp": timestamp
+    }
+
+def _parse_incidents(body: bytes, timestamp: datetime) -> List[Dict[str, Any]]:
+    """Parse a whole incidentDetails response into incident records; module-level so it pickles"""
+    return [_parse_incident(incident, timestamp) for incident in orjson.loads(body).get("incidents", [])]
+
+class IPv4HTTPAdapter(HTTPAdapter):
+    """HTTPAdapter pinned to IPv4, with keep-alive probes on top of urllib3's TCP_NODELAY default"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        kwargs["source_address"] = ("0.0.0.0", 0)
+        super().init_poolmanager(*args, **kwargs)
+
+class TokenBucket:
+    """Thread-safe token bucket for the synchronous request path"""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, waiting only as long as the refill needs"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            
+            time.sleep(wait)
 
 class TomTomConnector:
     """TomTom Traffic API Connector"""
     
+    # Endpoint paths under base_url
+    FLOW_PATH = "/services/4/flowSegmentData/absolute/10/json"
+    INCIDENTS_PATH_TMPL = "/services/5/incidentDetails/s3/{lat},{lon},{radius}/10/-1/json"
+    ROUTE_PATH_TMPL = "/routing/1/calculateRoute/{start_lat},{start_lon}:{end_lat},{end_lon}/json"
+    
+    # Per-endpoint query parameters that never change; never mutated
+    _INCIDENTS_PARAMS = {
+        "language": "en-US",
+        "categoryFilter": "0,1,2,3,4,5,6,7,8,9,10,11"
+    }
+    _ROUTE_PARAMS = {
+        "traffic": "true",
+        "travelMode": "car"
+    }
+    
     def __init__(self):
         self.api_key = os.getenv("TOMTOM_API_KEY")
         self.base_url = "https://api.tomtom.com/traffic"
-        self.rate_limit_delay = 1  # seconds between requests
+        
+        # Endpoint URLs, built once instead of per request
+        self._flow_url = self.base_url + self.FLOW_PATH
+        self._incidents_url_tmpl = self.base_url + self.INCIDENTS_PATH_TMPL
+        self._route_url_tmpl = self.base_url + self.ROUTE_PATH_TMPL
+        
+        # Rate limiting: a token bucket for the sync session, an AsyncLimiter per event loop for the async client
+        self.rate_limiter = TokenBucket(TOMTOM_RATE_LIMIT, TOMTOM_RATE_LIMIT)
+        self._async_limiter: Optional[AsyncLimiter] = None
+        self._async_limiter_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._parse_pool: Optional[ProcessPoolExecutor] = None  # started on the first large incidents response
         
         if not self.api_key:
             raise ValueError("TOMTOM_API_KEY environment variable is required")
+        
+        # Pooled keep-alive session shared by every request; every call is to one host
+        self.session = requests.Session()
+        retries = Retry(total=4, status_forcelist=[429, 502, 503, 504], backoff_factor=0.5, backoff_jitter=0.25,
+                        respect_retry_after_header=True)
+        self.session.mount("https://", IPv4HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retries))
+        self.session.params = {"key": self.api_key}
+        self.session.headers.update({"Accept-Encoding": "gzip"})
+        
+        # Shared by the sync and async paths; an outage stops both from spending quota
+        self._breaker = pybreaker.CircuitBreaker(fail_max=BREAKER_FAIL_MAX, reset_timeout=BREAKER_RESET_TIMEOUT,
+                                                 exclude=[_is_client_error], name="tomtom")
+        
+        # Shared response cache; without REDIS_URL every call goes to TomTom
+        self._redis_url = os.getenv("REDIS_URL")
+        self.redis = redis.Redis.from_url(self._redis_url, socket_timeout=1) if self._redis_url else None
+        self._async_redis: Optional[redis.asyncio.Redis] = None
+        self._async_redis_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def close(self):
+        """Release pooled connections and parse workers"""
+        self.session.close()
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+    
+    def open_async_client(self) -> httpx.AsyncClient:
+        """HTTP/2 client for the async methods; it is bound to the running loop, so open one per fan-out"""
+        # Binding the transport to 0.0.0.0 pins it to IPv4, like the sync adapter
+        transport = httpx.AsyncHTTPTransport(http2=True, limits=ASYNC_CLIENT_LIMITS, local_address="0.0.0.0")
+        return httpx.AsyncClient(transport=transport, timeout=ASYNC_CLIENT_TIMEOUT, params={"key": self.api_key})
+    
+    def __enter__(self):
+        return self
     
-    def get_traffic_flow(self, lat: float, lon: float, radius: float = 5.0) -> List[TrafficData]:
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _get_json(self, url: str, params: Dict[str, Any],
+                  validators: Optional[Dict[str, str]] = None) -> Tuple[Optional[Dict[str, Any]], Dict[str, str]]:
+        """Conditional GET of a TomTom JSON response; (None, validators) when it is unchanged, raises on request errors"""
+        with self._breaker.calling():
+            self.rate_limiter.acquire()
+            response = self.session.get(url, params=params, headers=_conditional_headers(validators), timeout=30)
+            if response.status_code == 304:
+                return None, validators
+            response.raise_for_status()
+        
+        return orjson.loads(response.content), _response_validators(response.headers)
+    
+    def _get_async_limiter(self) -> AsyncLimiter:
+        """AsyncLimiter for the running loop; limiters cannot be shared across loops"""
+        loop = asyncio.get_running_loop()
+        if self._async_limiter_loop is not loop:
+            self._async_limiter = AsyncLimiter(TOMTOM_RATE_LIMIT, 1)
+            self._async_limiter_loop = loop
+        return self._async_limiter
+    
+    def _get_async_redis(self) -> Optional[redis.asyncio.Redis]:
+        """asyncio Redis client for the running loop, or None without REDIS_URL; connections cannot be shared across loops"""
+        if self._redis_url is None:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._async_redis_loop is not loop:
+            self._async_redis = redis.asyncio.Redis.from_url(self._redis_url, socket_timeout=1)
+            self._async_redis_loop = loop
+        return self._async_redis
+    
+    def _cache_key(self, endpoint: str, key: str) -> str:
+        return f"tomtom:{endpoint}:{hashlib.sha1(key.encode()).hexdigest()}"
+    
+    def _cache_load(self, cache_key: str) -> Any:
+        """Cached value for cache_key, or None on a miss or Redis error"""
+        try:
+            blob = self.redis.get(cache_key)
+        except redis.RedisError as e:
+            logger.warning(f"TomTom cache read failed: {e}")
+            return None
+        return pickle.loads(blob) if blob is not None else None
+    
+    def _cache_store(self, cache_key: str, ttl: int, value: Any, validators: Optional[Dict[str, str]] = None):
+        """Store a fresh value plus the long-lived stale copy used when TomTom is unreachable"""
+        try:
+            pipe = self.redis.pipeline()
+            self._queue_cache_store(pipe, cache_key, ttl, value, validators)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"TomTom cache write failed: {e}")
+    
+    def _queue_cache_store(self, pipe, cache_key: str, ttl: int, value: Any, validators: Optional[Dict[str, str]]):
+        """Queue the fresh, stale and validator writes on a sync or asyncio Redis pipeline"""
+        blob = pickle.dumps(value)
+        pipe.setex(cache_key, ttl, blob)
+        pipe.setex(cache_key + ":stale", STALE_CACHE_TTL, blob)
+        # Validators live as long as the stale copy, which is the body a 304 revalidates
+        if validators and any(validators.values()):
+            pipe.setex(cache_key + ":validators", STALE_CACHE_TTL, pickle.dumps(validators))
+        else:
+            pipe.delete(cache_key + ":validators")
+    
+    def _cached_get(self, endpoint: str, key: str, ttl: int, url: str, params: Dict[str, Any]) -> Any:
+        """Serve a response from Redis, revalidating expired entries with a conditional GET"""
+        if self.redis is None:
+            return self._get_json(url, params)[0]
+        
+        cache_key = self._cache_key(endpoint, key)
+        result = self._cache_load(cache_key)
+        if result is not None:
+            return result
+        
+        validators = self._cache_load(cache_key + ":validators")
+        try:
+            result, validators = self._get_json(url, params, validators)
+            if result is not None:
+                logger.debug(f"TomTom {endpoint} cache miss for {key}")
+            else:
+                result = self._cache_load(cache_key + ":stale")
+                if result is not None:
+                    logger.debug(f"TomTom {endpoint} 304 revalidated for {key}")
+                else:
+                    # Stale copy was evicted under its validators; fetch the body again
+                    result, validators = self._get_json(url, params)
+        except _REQUEST_ERRORS as e:
+            # Fall back to the last good response rather than returning nothing
+            result = self._cache_load(cache_key + ":stale")
+            if result is None:
+                raise
+            logger.warning(f"Serving stale TomTom {endpoint} data for {key}: {e}")
+            return result
+        
+        self._cache_store(cache_key, ttl, result, validators)
+        return result
+    
+    async def _cache_load_async(self, cache_key: str) -> Any:
+        """Async counterpart of _cache_load"""
+        try:
+            blob = await self._get_async_redis().get(cache_key)
+        except redis.RedisError as e:
+            logger.warning(f"TomTom cache read failed: {e}")
+            return None
+        return pickle.loads(blob) if blob is not None else None
+    
+    async def _cache_store_async(self, cache_key: str, ttl: int, value: Any,
+                                 validators: Optional[Dict[str, str]] = None):
+        """Async counterpart of _cache_store"""
+        try:
+            pipe = self._get_async_redis().pipeline()
+            self._queue_cache_store(pipe, cache_key, ttl, value, validators)
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"TomTom cache write failed: {e}")
+    
+    async def _get_bytes_async(self, client: httpx.AsyncClient, url: str, params: Dict[str, Any],
+                               validators: Optional[Dict[str, str]] = None) -> Tuple[Optional[bytes], Dict[str, str]]:
+        """Async counterpart of _get_json returning the raw body; (None, validators) when it is unchanged"""
+        with self._breaker.calling():
+            async with self._get_async_limiter():
+                response = await client.get(url, params=params, headers=_conditional_headers(validators))
+            # httpx treats 3xx as an error status, so check for 304 first
+            if response.status_code == 304:
+                return None, validators
+            response.raise_for_status()
+        
+        return response.content, _response_validators(response.headers)
+    
+    async def _cached_get_async(self, client: httpx.AsyncClient, endpoint: str, key: str, ttl: int, url: str,
+                                params: Dict[str, Any], decode: Callable[[bytes], Any]) -> Any:
+        """Async counterpart of _cached_get; decode turns a response body into the value that is cached"""
+        if self._get_async_redis() is None:
+            return decode((await self._get_bytes_async(client, url, params))[0])
+        
+        cache_key = self._cache_key(endpoint, key)
+        result = await self._cache_load_async(cache_key)
+        if result is not None:
+            return result
+        
+        validators = await self._cache_load_async(cache_key + ":validators")
+        try:
+            body, validators = await self._get_bytes_async(client, url, params, validators)
+            if body is not None:
+                logger.debug(f"TomTom {endpoint} cache miss for {key}")
+                result = decode(body)
+            else:
+                result = await self._cache_load_async(cache_key + ":stale")
+                if result is not None:
+                    logger.debug(f"TomTom {endpoint} 304 revalidated for {key}")
+                else:
+                    # Stale copy was evicted under its validators; fetch the body again
+                    body, validators = await self._get_bytes_async(client, url, params)
+                    result = decode(body)
+        except _ASYNC_REQUEST_ERRORS as e:
+            # Fall back to the last good response rather than returning nothing
+            result = await self._cache_load_async(cache_key + ":stale")
+            if result is None:
+                raise
+            logger.warning(f"Serving stale TomTom {endpoint} data for {key}: {e}")
+            return result
+        
+        await self._cache_store_async(cache_key, ttl, result, validators)
+        return result
+    
+    def get_traffic_flow(self, lat: float, lon: float, radius: float = 5.0,
+                         city: Optional[str] = None) -> List[TrafficData]:
         """Get traffic flow data for a geographic area"""
         try:
-            # TomTom Traffic Flow API endpoint
-            url = f"{self.base_url}/services/4/flowSegmentData/absolute/10/json"
-            
             params = {
-                "key": self.api_key,
                 "point": f"{lat},{lon}",
                 "unit": "KMPH"
             }
             
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            traffic_data = []
-            
-            # Parse TomTom response
-            if "flowSegmentData" in data:
-                segment = data["flowSegmentData"]
-                
-                traffic_item = TrafficData(
-                    location_lat=lat,
-                    location_lon=lon,
-                    congestion_level=self._calculate_congestion_level(
-                        segment.get("currentSpeed", 0),
-                        segment.get("freeFlowSpeed", 1)
-                    ),
-                    average_speed=segment.get("currentSpeed", 0),
-                    incident_count=0,  # TomTom flow API doesn't provide incidents
-                    road_type=segment.get("roadClosure", "unknown"),
-                    timestamp=datetime.utcnow()
-                )
-                
-                traffic_data.append(traffic_item)
-            
-            # Rate limiting
-            time.sleep(self.rate_limit_delay)
+            # Raw responses are cached so each caller still gets its own coordinates and city;
+            # 3 decimals (~110 m) lets neighbouring grid points share an entry
+            data = self._cached_get("flow", f"{lat:.3f},{lon:.3f}", FLOW_CACHE_TTL, self._flow_url, params)
             
-            return traffic_data
+            return self._parse_traffic_flow(data, lat, lon, city)
             
-        except requests.exceptions.RequestException as e:
+        except _REQUEST_ERRORS as e:
             logger.error(f"Error fetching TomTom traffic data: {e}")
             return []
         except Exception as e:
             logger.error(f"Unexpected error in TomTom connector: {e}")
             return []
     
-    def get_traffic_incidents(self, lat: float, lon: float, radius: float = 10.0) -> List[Dict[str, Any]]:
-        """Get traffic incidents in a geographic area"""
-        try:
-            url = f"{self.base_url}/services/5/incidentDetails/s3/{lat},{lon},{radius}/10/-1/json"
-            
-            params = {
-                "key": self.api_key,
-                "language": "en-US",
-                "categoryFilter": "0,1,2,3,4,5,6,7,8,9,10,11"
-            }
-            
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
+    async def get_traffic_flow_async(self, client: httpx.AsyncClient, lat: float, lon: float,
+                                     city: Optional[str] = None,
+                                     timestamp: Optional[datetime] = None) -> List[TrafficData]:
+        """Async variant of get_traffic_flow for concurrent fan-out; raises on request errors"""
+        data = await self._fetch_traffic_flow_async(client, lat, lon)
+        return self._parse_traffic_flow(data, lat, lon, city, timestamp)
+    
+    async def get_traffic_flow_batch(self, client: httpx.AsyncClient, lats: np.ndarray, lons: np.ndarray,
+                                     cities: Optional[np.ndarray] = None, max_concurrency: int = 10,
+                                     timestamp: Optional[datetime] = None,
+                                     incident_counts: Optional[np.ndarray] = None,
+                                     tile_km: Optional[float] = None) -> TrafficBatch:
+        """Fetch flow for every point concurrently into one column-wise batch; failed points are logged and skipped.
+        
+        With tile_km, points are bucketed into tiles of roughly that size and each tile is fetched once
+        """
+        # One poll, one timestamp: records from the same batch line up exactly in time series
+        polled_at = np.datetime64(timestamp or datetime.utcnow(), "ns")
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        cities = np.full(len(lats), None, dtype=object) if cities is None else np.asarray(cities, dtype=object)
+        
+        if tile_km is None:
+            first = owner = np.arange(len(lats))
+        else:
+            # One request per occupied tile, fanned back out to every point in it; tile width in
+            # longitude follows cos(lat) at the centre of its row so tiles stay roughly square in km
+            lat_tile = tile_km / 111.0
+            tile_rows = np.floor(lats / lat_tile)
+            lon_tile = tile_km / (111.0 * np.maximum(np.cos(np.radians((tile_rows + 0.5) * lat_tile)), 0.01))
+            cells = np.stack([tile_rows, np.floor(lons / lon_tile)], axis=1)
+            _, first, owner = np.unique(cells, axis=0, return_index=True, return_inverse=True)
+            owner = owner.ravel()
+        
+        # Preallocated per-cell slots; each task writes only its own index, so no locking
+        n_cells = len(first)
+        current_speeds = np.empty(n_cells, dtype=np.float64)
+        free_flow_speeds = np.empty(n_cells, dtype=np.float64)
+        road_types = np.empty(n_cells, dtype=object)
+        fetched = np.zeros(n_cells, dtype=bool)
+        
+        async def fetch(slot: int, lat: float, lon: float):
+            try:
+                async with semaphore:
+                    data = await self._fetch_traffic_flow_async(client, lat, lon)
+            except Exception as e:
+                logger.error(f"Error processing location {lat}, {lon}: {e}")
+                return
+            if "flowSegmentData" not in data:
+                return
             
-            data = response.json()
-            incidents = []
+            segment = data["flowSegmentData"]
+            current_speeds[slot] = segment.get("currentSpeed", 0)
+            free_flow_speeds[slot] = segment.get("freeFlowSpeed", 1)
+            road_types[slot] = segment.get("roadClosure", "unknown")
+            fetched[slot] = True
+        
+        await asyncio.gather(*[fetch(slot, lats[i], lons[i]) for slot, i in enumerate(first.tolist())])
+        
+        rows = np.flatnonzero(fetched[owner])
+        slots = owner[rows]
+        current_speeds = current_speeds[slots]
+        
+        return TrafficBatch(
+            location_lat=lats[rows],
+            location_lon=lons[rows],
+            congestion_level=self._calculate_congestion_level_batch(current_speeds, free_flow_speeds[slots]),
+            average_speed=current_speeds,
+            incident_count=(np.zeros(len(rows), dtype=np.int64) if incident_counts is None  # TomTom flow API doesn't provide incidents
+                            else np.asarray(incident_counts, dtype=np.int64)[rows]),
+            road_type=road_types[slots],
+            timestamp=np.full(len(rows), polled_at),
+            city=cities[rows]
+        )
+    
+    async def _fetch_traffic_flow_async(self, client: httpx.AsyncClient, lat: float, lon: float) -> Dict[str, Any]:
+        """Rate-limited flowSegmentData request, sharing the sync path's Redis entries; raises on request errors"""
+        params = {
+            "point": f"{lat},{lon}",
+            "unit": "KMPH"
+        }
+        
+        return await self._cached_get_async(client, "flow", f"{lat:.3f},{lon:.3f}", FLOW_CACHE_TTL,
+                                            self._flow_url, params, orjson.loads)
+    
+    def _parse_traffic_flow(self, data: Dict[str, Any], lat: float, lon: float,
+                            city: Optional[str] = None, timestamp: Optional[datetime] = None) -> List[TrafficData]:
+        """Convert a TomTom flowSegmentData response into TrafficData records"""
+        traffic_data = []
+        
+        # Parse TomTom response
+        if "flowSegmentData" in data:
+            segment = data["flowSegmentData"]
             
-            if "incidents" in data:
-                for incident in data["incidents"]:
-                    incidents.append({
-                        "id": incident.get("id"),
-                        "type": incident.get("iconCategory"),
-                        "description": incident.get("description"),
-                        "severity": incident.get("magnitude", 0),
-                        "location": {
-                            "lat": incident.get("geometry", {}).get("coordinates", [0, 0])[1],
-                            "lon": incident.get("geometry", {}).get("coordinates", [0, 0])[0]
-                        },
-                        "road": incident.get("roadNumbers", ["Unknown"])[0] if incident.get("roadNumbers") else "Unknown",
-                        "timestamp": datetime.utcnow()
-                    })
+            traffic_item = TrafficData(
+                location_lat=lat,
+                location_lon=lon,
+                congestion_level=self._calculate_congestion_level(
+                    segment.get("currentSpeed", 0),
+                    segment.get("freeFlowSpeed", 1)
+                ),
+                average_speed=segment.get("currentSpeed", 0),
+                incident_count=0,  # TomTom flow API doesn't provide incidents
+                road_type=segment.get("roadClosure", "unknown"),
+                timestamp=timestamp or datetime.utcnow(),
+                city=city
+            )
             
-            time.sleep(self.rate_limit_delay)
-            return incidents
+            traffic_data.append(traffic_item)
+        
+        return traffic_data
+    
+    def get_traffic_incidents(self, lat: float, lon: float, radius: float = 10.0) -> List[Dict[str, Any]]:
+        """Get traffic incidents in a geographic area"""
+        try:
+            return list(self.iter_traffic_incidents(lat, lon, radius))
             
-        except requests.exceptions.RequestException as e:
+        except _REQUEST_ERRORS as e:
             logger.error(f"Error fetching TomTom incidents: {e}")
             return []
         except Exception as e:
             logger.error(f"Unexpected error fetching incidents: {e}")
             return []
     
+    async def get_traffic_incidents_async(self, client: httpx.AsyncClient, lat: float, lon: float,
+                                          radius: float = 10.0) -> List[Dict[str, Any]]:
+        """Async variant of get_traffic_incidents; large responses are parsed in a worker process, raises on request errors"""
+        url = self._incidents_url_tmpl.format(lat=lat, lon=lon, radius=radius)
+        
+        # The raw body is cached so a hit still takes the worker-process parse for large responses
+        body = await self._cached_get_async(client, "incidents", f"{lat:.3f},{lon:.3f},{radius}", INCIDENTS_CACHE_TTL,
+                                            url, self._INCIDENTS_PARAMS, bytes)
+        
+        now = datetime.utcnow()
+        if len(body) < INCIDENTS_PARSE_POOL_MIN_BYTES:
+            return _parse_incidents(body, now)
+        
+        # Keeps the event loop free to drive the flow fan-out while a worker parses
+        if self._parse_pool is None:
+            self._parse_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        return await asyncio.get_running_loop().run_in_executor(self._parse_pool, _parse_incidents, body, now)
+    
+    def iter_traffic_incidents(self, lat: float, lon: float, radius: float = 10.0) -> Iterator[Dict[str, Any]]:
+        """Yield incidents in a geographic area as the response streams in; raises on request errors"""
+        cache_key = self._cache_key("incident_items", f"{lat:.3f},{lon:.3f},{radius}") if self.redis is not None else None
+        if cache_key is not None:
+            cached = self._cache_load(cache_key)
+            if cached is not None:
+                now = datetime.utcnow()
+                yield from (_parse_incident(incident, now) for incident in cached)
+                return
+        
+        url = self._incidents_url_tmpl.format(lat=lat, lon=lon, radius=radius)
+        
+        try:
+            with self._breaker.calling():
+                self.rate_limiter.acquire()
+                response = self.session.get(url, params=self._INCIDENTS_PARAMS, stream=True, timeout=30)
+                response.raise_for_status()
+        except _REQUEST_ERRORS as e:
+            stale = self._cache_load(cache_key + ":stale") if cache_key is not None else None
+            if stale is None:
+                raise
+            logger.warning(f"Serving stale TomTom incidents for {lat:.3f},{lon:.3f}: {e}")
+            now = datetime.utcnow()
+            yield from (_parse_incident(incident, now) for incident in stale)
+            return
+        
+        # Only the raw items are kept, and only when they are going to be cached
+        raw_incidents = [] if cache_key is not None else None
+        now = datetime.utcnow()
+        with response:
+            response.raw.decode_content = True
+            for incident in ijson.items(response.raw, "incidents.item", use_float=True):
+                if raw_incidents is not None:
+                    raw_incidents.append(incident)
+                yield _parse_incident(incident, now)
+        
+        if raw_incidents is not None:
+            self._cache_store(cache_key, INCIDENTS_CACHE_TTL, raw_incidents)
+    
     def _calculate_congestion_level(self, current_speed: float, free_flow_speed: float) -> float:
         """Calculate congestion level (0-1) based on speed ratio"""
         if free_flow_speed <= 0:
             return 0.0
         
-        speed_ratio = current_speed / free_flow_speed
+        # bisect_right so a ratio exactly on a threshold falls in the lighter band
+        return _CONGESTION_LEVELS[bisect.bisect_right(_RATIO_THRESHOLDS, current_speed / free_flow_speed)]
+    
+    def _calculate_congestion_level_batch(self, current_speeds: np.ndarray, free_flow_speeds: np.ndarray) -> np.ndarray:
+        """Vectorized _calculate_congestion_level over arrays of speeds"""
+        current_speeds = np.asarray(current_speeds, dtype=np.float64)
+        free_flow_speeds = np.asarray(free_flow_speeds, dtype=np.float64)
         
-        if speed_ratio >= 0.8:
-            return 0.0  # Free flow
-        elif speed_ratio >= 0.6:
-            return 0.3  # Light congestion
-        elif speed_ratio >= 0.4:
-            return 0.6  # Moderate congestion
-        else:
-            return 1.0  # Heavy congestion
+        valid = free_flow_speeds > 0
+        ratios = np.divide(current_speeds, free_flow_speeds, out=np.zeros_like(current_speeds), where=valid)
+        levels = _CONGESTION_LEVELS_ARRAY[np.searchsorted(_RATIO_THRESHOLDS_ARRAY, ratios, side="right")]
+        
+        return np.where(valid, levels, 0.0)
     
     def get_route_traffic(self, start_lat: float, start_lon: float, 
                          end_lat: float, end_lon: float) -> Dict[str, Any]:
         """Get traffic information for a specific route"""
         try:
-            url = f"{self.base_url}/routing/1/calculateRoute/{start_lat},{start_lon}:{end_lat},{end_lon}/json"
+            url = self._route_url_tmpl.format(start_lat=start_lat, start_lon=start_lon,
+                                              end_lat=end_lat, end_lon=end_lon)
             
-            params = {
-                "key": self.api_key,
-                "traffic": "true",
-                "travelMode": "car"
-            }
-            
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._cached_get(
+                "route", f"{start_lat:.3f},{start_lon:.3f}:{end_lat:.3f},{end_lon:.3f}", ROUTE_CACHE_TTL,
+                url, self._ROUTE_PARAMS
+            )
             
             if "routes" in data and len(data["routes"]) > 0:
                 route = data["routes"][0]
@@ -171,10 +711,9 @@ class TomTomConnector:
                     "route_points": route.get("legs", [{}])[0].get("points", [])
                 }
             
-            time.sleep(self.rate_limit_delay)
             return {}
             
-        except requests.exceptions.RequestException as e:
+        except _REQUEST_ERRORS as e:
             logger.error(f"Error fetching route traffic: {e}")
             return {}
         except Exception as e:
@@ -186,72 +725,176 @@ class DataIngestionPipeline:
     
     def __init__(self):
         self.tomtom = TomTomConnector()
-        self.batch_size = 100
-        self.processing_delay = 5  # seconds between batches
+        self.max_concurrency = 10  # in-flight flow requests
+        self.flow_tile_km = FLOW_TILE_KM  # region grid points per flow call, by area
+        
+        project_id = os.getenv("GCP_PROJECT_ID")
+        dataset_id = os.getenv("BIGQUERY_DATASET_ID", "drivewise_ai")
+        default_table = f"{project_id}.{dataset_id}.traffic_data" if project_id else f"{dataset_id}.traffic_data"
+        self.traffic_table = os.getenv("BIGQUERY_TRAFFIC_TABLE", default_table)
+        self.batch_size = BIGQUERY_UPLOAD_BATCH_SIZE
+        self._bigquery_client = None
     
     def ingest_traffic_data_for_region(self, center_lat: float, center_lon: float, 
-                                     radius: float = 25.0) -> List[TrafficData]:
+                                     radius: float = 25.0) -> TrafficBatch:
         """Ingest traffic data for a geographic region"""
-        all_traffic_data = []
-        
         # Generate grid points around the center
         grid_points = self._generate_grid_points(center_lat, center_lon, radius, grid_size=5)
         
         logger.info(f"Ingesting traffic data for {len(grid_points)} locations")
         
-        for i, (lat, lon) in enumerate(grid_points):
+        traffic_batch = asyncio.run(self._ingest_region_async(grid_points, center_lat, center_lon, radius))
+        
+        logger.info(f"Completed traffic data ingestion: {len(traffic_batch)} records")
+        return traffic_batch
+    
+    async def _ingest_region_async(self, points: np.ndarray, center_lat: float, center_lon: float,
+                                   radius: float) -> TrafficBatch:
+        """Fetch the region's incidents and flow for every grid point over one HTTP/2 client"""
+        async with self.tomtom.open_async_client() as client:
+            # One incidents call for the whole region; the circle reaches the grid's corners
             try:
-                traffic_data = self.tomtom.get_traffic_flow(lat, lon)
-                all_traffic_data.extend(traffic_data)
-                
-                # Log progress
-                if (i + 1) % 10 == 0:
-                    logger.info(f"Processed {i + 1}/{len(grid_points)} locations")
-                
-                # Batch processing delay
-                if (i + 1) % self.batch_size == 0:
-                    time.sleep(self.processing_delay)
-                    
-            except Exception as e:
-                logger.error(f"Error processing location {lat}, {lon}: {e}")
-                continue
+                incidents = await self.tomtom.get_traffic_incidents_async(
+                    client, center_lat, center_lon, radius * math.sqrt(2)
+                )
+            except (httpx.HTTPError, pybreaker.CircuitBreakerError) as e:
+                logger.error(f"Error fetching TomTom incidents: {e}")
+                incidents = []
+            
+            return await self.tomtom.get_traffic_flow_batch(
+                client, points[:, 0], points[:, 1], max_concurrency=self.max_concurrency,
+                incident_counts=self._count_incidents_per_point(points, incidents, center_lat),
+                tile_km=self.flow_tile_km
+            )
+    
+    async def _ingest_async(self, points: np.ndarray, timestamp: Optional[datetime] = None) -> TrafficBatch:
+        """Fetch flow data for an (N, 2) array of lat/lon rows concurrently over one HTTP/2 client"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        
+        # Bounded concurrency replaces the per-batch sleep
+        async with self.tomtom.open_async_client() as client:
+            return await self.tomtom.get_traffic_flow_batch(
+                client, points[:, 0], points[:, 1], max_concurrency=self.max_concurrency, timestamp=timestamp
+            )
+    
+    def _count_incidents_per_point(self, points: np.ndarray, incidents: List[Dict[str, Any]],
+                                   center_lat: float) -> np.ndarray:
+        """Count incidents per grid point, assigning each incident to its nearest point"""
+        coords = [
+            (incident["location"]["lat"], incident["location"]["lon"]) for incident in incidents
+            if isinstance(incident["location"]["lat"], (int, float)) and isinstance(incident["location"]["lon"], (int, float))
+        ]
+        if not coords:
+            return np.zeros(len(points), dtype=np.int64)
+        
+        coords = np.array(coords, dtype=np.float64)
+        
+        # Equirectangular distances are plenty at grid scale
+        dlat = coords[:, None, 0] - points[None, :, 0]
+        dlon = (coords[:, None, 1] - points[None, :, 1]) * math.cos(math.radians(center_lat))
+        nearest = np.argmin(dlat * dlat + dlon * dlon, axis=1)
         
-        logger.info(f"Completed traffic data ingestion: {len(all_traffic_data)} records")
-        return all_traffic_data
+        return np.bincount(nearest, minlength=len(points)).astype(np.int64)
     
     def _generate_grid_points(self, center_lat: float, center_lon: float, 
-                            radius: float, grid_size: int = 5) -> List[tuple]:
-        """Generate grid points for data collection"""
-        points = []
+                            radius: float, grid_size: int = 5) -> np.ndarray:
+        """Generate grid points for data collection as an (N, 2) array of lat/lon rows"""
+        steps = np.arange(-grid_size, grid_size + 1)
         
         # Convert radius from km to degrees (approximate)
         lat_step = radius / 111.0 / grid_size  # 1 degree lat ≈ 111 km
-        lon_step = radius / (111.0 * abs(center_lat)) / grid_size  # Adjust for longitude
+        # Longitude degrees shrink with cos(lat); the floor keeps the step finite near the poles
+        lon_step = radius / (111.0 * max(math.cos(math.radians(center_lat)), 0.01)) / grid_size
         
-        for i in range(-grid_size, grid_size + 1):
-            for j in range(-grid_size, grid_size + 1):
-                lat = center_lat + i * lat_step
-                lon = center_lon + j * lon_step
-                points.append((lat, lon))
+        # Rows past a pole stay on it and columns wrap across the antimeridian, so every point is a valid coordinate
+        grid_lats = np.clip(center_lat + steps * lat_step, -90.0, 90.0)
+        grid_lons = (center_lon + steps * lon_step + 180.0) % 360.0 - 180.0
         
-        return points
+        lats, lons = np.meshgrid(grid_lats, grid_lons, indexing="ij")
+        return np.stack([lats.ravel(), lons.ravel()], axis=1)
+    
+    def upload_traffic_batch(self, traffic_batch: TrafficBatch) -> bool:
+        """Load a batch into BigQuery as Parquet, one load job per batch_size rows"""
+        if len(traffic_batch) == 0:
+            return True
+        
+        try:
+            # Append only; field addition upgrades tables created before city joined the schema
+            job_config = bigquery.LoadJobConfig(
+                source_format=bigquery.SourceFormat.PARQUET,
+                write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+                schema_update_options=[bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION],
+            )
+            
+            record_batch = traffic_batch.to_arrow()
+            for offset in range(0, record_batch.num_rows, self.batch_size):
+                chunk = record_batch.slice(offset, self.batch_size)
+                
+                buffer = io.BytesIO()
+                pq.write_table(pa.Table.from_batches([chunk]), buffer)
+                buffer.seek(0)
+                
+                self._get_bigquery_client().load_table_from_file(
+                    buffer, self.traffic_table, job_config=job_config
+                ).result()
+            
+            logger.info(f"Uploaded {record_batch.num_rows} traffic records to {self.traffic_table}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error uploading traffic batch to BigQuery: {e}")
+            return False
+    
+    def upload_traffic_records(self, records: List[TrafficData]) -> bool:
+        """Append row-wise TrafficData to BigQuery with a single JSON load job"""
+        if not records:
+            return True
+        
+        try:
+            job_config = bigquery.LoadJobConfig(
+                schema=TRAFFIC_BIGQUERY_SCHEMA,
+                write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+                schema_update_options=[bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION],
+            )
+            rows = [{**asdict(record), "timestamp": record.timestamp.isoformat()} for record in records]
+            
+            self._get_bigquery_client().load_table_from_json(rows, self.traffic_table, job_config=job_config).result()
+            
+            logger.info(f"Uploaded {len(rows)} traffic records to {self.traffic_table}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error uploading traffic records to BigQuery: {e}")
+            return False
+    
+    def _get_bigquery_client(self) -> bigquery.Client:
+        """BigQuery client shared by every upload, created on first use"""
+        if self._bigquery_client is None:
+            self._bigquery_client = bigquery.Client()
+        return self._bigquery_client
     
     def run_continuous_ingestion(self, locations: List[tuple], interval_minutes: int = 15):
         """Run continuous data ingestion for specified locations"""
         logger.info(f"Starting continuous ingestion for {len(locations)} locations")
         logger.info(f"Update interval: {interval_minutes} minutes")
         
+        try:
+            asyncio.run(self._run_continuous_async(locations, interval_minutes))
+        except KeyboardInterrupt:
+            logger.info("Continuous ingestion stopped by user")
+    
+    async def _run_continuous_async(self, locations: List[tuple], interval_minutes: int):
         while True:
             try:
                 start_time = datetime.utcnow()
-                all_data = []
                 
-                for lat, lon in locations:
-                    traffic_data = self.tomtom.get_traffic_flow(lat, lon)
-                    all_data.extend(traffic_data)
+                traffic_batch = await self._ingest_async(locations, timestamp=start_time)
+                
+                logger.info(f"Collected {len(traffic_batch)} traffic records")
                 
-                # Here you would typically save to BigQuery
-                logger.info(f"Collected {len(all_data)} traffic records")
+                # Load jobs block, so keep them off the event loop
+                if not await asyncio.to_thread(self.upload_traffic_batch, traffic_batch):
+                    logger.warning("Traffic batch was not saved to BigQuery")
                 
                 # Calculate sleep time
                 elapsed = (datetime.utcnow() - start_time).total_seconds()
@@ -259,14 +902,11 @@ class DataIngestionPipeline:
                 
                 if sleep_time > 0:
                     logger.info(f"Sleeping for {sleep_time:.1f} seconds until next collection")
-                    time.sleep(sleep_time)
+                    await asyncio.sleep(sleep_time)
                 
-            except KeyboardInterrupt:
-                logger.info("Continuous ingestion stopped by user")
-                break
             except Exception as e:
                 logger.error(f"Error in continuous ingestion: {e}")
-                time.sleep(60)  # Wait 1 minute before retrying
+                await asyncio.sleep(60)  # Wait 1 minute before retrying
 
 def main():
     """Main function for testing the data ingestion pipeline"""
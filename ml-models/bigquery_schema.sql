@@ -48,6 +48,7 @@ CREATE OR REPLACE TABLE `drivewise_ai.traffic_data` (
   road_type STRING,
   weather STRING,
   source STRING,
+  city STRING,
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP()
 )
 PARTITION BY DATE(timestamp)